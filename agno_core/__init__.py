@@ -0,0 +1,29 @@
+"""
+Núcleo compartilhado do Agno Multi-Agent System
+Usado tanto pelo servidor principal (main.py) quanto pelas funções do Vercel (api/)
+
+Dependências pesadas (google.generativeai, fallbacks de HTML) só são importadas
+quando usadas, para manter o cold start das funções serverless pequeno.
+"""
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente antes de qualquer módulo ler o .env
+load_dotenv()
+
+_LAZY_EXPORTS = {
+    "ResearchAgent": "agno_core.agents",
+    "CoderAgent": "agno_core.agents",
+    "SupervisorAgent": "agno_core.agents",
+    "get_supervisor": "agno_core.agents",
+    "api_config": "agno_core.config",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'agno_core' has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(module), name)
@@ -0,0 +1,129 @@
+"""
+Controle de admissão na frente do SupervisorAgent
+Limita o trabalho em andamento no worker, divide a vez entre clientes (usuário,
+conversa ou IP) e recusa rápido quando o rate limit dos modelos já está esgotado,
+em vez de começar chamadas que vão estourar o deadline juntas.
+"""
+import os
+import math
+import time
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from .scheduler import tier_scheduler
+
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16"))
+ADMISSION_MAX_PER_CLIENT = int(os.getenv("ADMISSION_MAX_PER_CLIENT", "2"))
+ADMISSION_INITIAL_ESTIMATE = float(os.getenv("ADMISSION_INITIAL_ESTIMATE", "10"))
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada; `retry_after` é a espera estimada em segundos"""
+
+    def __init__(self, reason: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def client_key(ip: Optional[str] = None, user: Optional[str] = None,
+               conversation_id: Optional[str] = None) -> str:
+    """Identidade usada na divisão justa: usuário, depois conversa, depois IP"""
+    if user:
+        return f"user:{user}"
+    if conversation_id:
+        return f"conversation:{conversation_id}"
+    return f"ip:{ip or 'desconhecido'}"
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+                 max_per_client: int = ADMISSION_MAX_PER_CLIENT):
+        self.max_in_flight = max_in_flight
+        self.max_per_client = max_per_client
+        self.in_flight = 0
+        self.per_client: Dict[str, int] = {}
+        self.average_duration = ADMISSION_INITIAL_ESTIMATE
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    async def _check_rate_limits(self):
+        # A decisão do supervisor é a primeira chamada; sem token em nenhum nível, recusar já
+        wait = await tier_scheduler.capacity("supervisor")
+        if wait > 0:
+            raise AdmissionRejected(
+                "rate_limited",
+                "Limite de chamadas aos modelos atingido no momento.",
+                wait,
+            )
+
+    def _acquire(self, client: str, weight: int = 1):
+        with self._lock:
+            if self.in_flight + weight > self.max_in_flight:
+                # Com N requisições em andamento, uma vaga abre em ~duração média / N
+                raise AdmissionRejected(
+                    "busy",
+                    "Servidor ocupado com outras solicitações.",
+                    self.average_duration / max(self.in_flight, 1),
+                )
+            if self.per_client.get(client, 0) >= self.max_per_client:
+                raise AdmissionRejected(
+                    "client_limit",
+                    "Aguarde suas solicitações anteriores terminarem.",
+                    self.average_duration,
+                )
+            self.in_flight += weight
+            self.per_client[client] = self.per_client.get(client, 0) + 1
+
+    def _release(self, client: str, duration: float, weight: int = 1):
+        with self._lock:
+            self.in_flight -= weight
+            remaining = self.per_client.get(client, 1) - 1
+            if remaining > 0:
+                self.per_client[client] = remaining
+            else:
+                self.per_client.pop(client, None)
+            self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+
+    @asynccontextmanager
+    async def slot(self, client: str, weight: int = 1):
+        """
+        Reserva uma vaga para o cliente ou levanta AdmissionRejected imediatamente.
+        `weight` é quantas vagas globais a requisição ocupa (ex.: itens paralelos de um lote);
+        para o limite por cliente ela conta como uma requisição.
+        """
+        weight = max(1, min(weight, self.max_in_flight))
+        try:
+            self._acquire(client, weight)
+        except AdmissionRejected as e:
+            self.rejected += 1
+            print(f"🚦 [ADMISSION] Recusado ({e.reason}) para {client}, tentar em {e.retry_after}s")
+            raise
+        started = time.monotonic()
+        try:
+            await self._check_rate_limits()
+        except AdmissionRejected as e:
+            self.rejected += 1
+            self._release(client, self.average_duration, weight)
+            print(f"🚦 [ADMISSION] Recusado ({e.reason}) para {client}, tentar em {e.retry_after}s")
+            raise
+        try:
+            yield
+        finally:
+            self._release(client, time.monotonic() - started, weight)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "clients": len(self.per_client),
+                "rejected": self.rejected,
+                "average_duration": round(self.average_duration, 2),
+            }
+
+
+# Controle compartilhado pelo worker
+admission = AdmissionController()
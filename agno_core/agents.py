@@ -0,0 +1,676 @@
+"""
+Agentes do sistema: pesquisa, criação de websites e supervisor
+"""
+import re
+import json
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import (
+    api_config,
+    MODELS,
+    CODER_MAX_RETRIES,
+    CODER_BASE_DELAY,
+    CODER_STREAMING,
+    RESEARCH_CACHE_TTL,
+    SPECULATIVE_EXECUTION,
+    SPECULATION_MAX_WASTE,
+)
+from .retry import retry_with_backoff, classify_error, RequestDeadlineExceeded
+from .hedging import hedged_call, HEDGE_ALTERNATE_LEVEL
+from .clients import get_model, stream_text, finish_reason
+from .extractor import ExtractedSite, HtmlExtractor, extract_text
+from .artifacts import artifact_store, inline_content
+from . import editing
+from . import sections
+from . import postprocess
+from . import budgets
+from .prompts import get_prompt
+from .state import get_state
+from .routing import route, is_edit_request, edit_decision
+from .scheduler import tier_scheduler, estimate_complexity
+
+# Expressões compiladas uma vez na importação do módulo
+_DECISION_JSON = re.compile(r'\{.*\}', re.DOTALL)
+_DECISION_ARRAY = re.compile(r'\[.*\]', re.DOTALL)
+
+AI_THEME_KEYWORDS = (
+    'inteligência artificial', 'ia', 'artificial intelligence', 'ai',
+    'machine learning', 'deep learning', 'futuro', 'tecnologia',
+    'automação', 'robôs', 'algoritmos'
+)
+
+class ResearchAgent:
+    def __init__(self, model_level: str = "base"):
+        # Nível preferido; o escalonador pode subir pela complexidade ou descer sob pressão
+        self.model_level = model_level
+    
+    async def research(self, query: str) -> Dict[str, Any]:
+        # Pesquisas repetidas são servidas do cache compartilhado entre workers
+        # A versão do template entra na chave: mudar o prompt invalida o cache
+        template = get_prompt("research")
+        cache_key = f"research:{template.key}:" + hashlib.sha256(query.strip().lower().encode("utf-8")).hexdigest()
+        if RESEARCH_CACHE_TTL > 0:
+            cached = await get_state().cache_get(cache_key)
+            if cached is not None:
+                print(f"♻️ [RESEARCH] Resultado em cache para: {query}")
+                return json.loads(cached)
+        
+        try:
+            # Escolher o nível para esta chamada e a chave correspondente
+            level = await tier_scheduler.select("research", query, preferred=self.model_level)
+            api_key = api_config.resolve_api_key(level)
+            if not api_key:
+                return {
+                    "type": "research",
+                    "query": query,
+                    "results": "Erro: Nenhuma chave de API válida disponível para pesquisa",
+                    "sources": []
+                }
+            
+            model = get_model(MODELS[level], api_key)
+            
+            prompt = template.render(query=query)
+            
+            async with tier_scheduler.observe(level):
+                response = await retry_with_backoff(
+                    model.generate_content, prompt,
+                    generation_config=budgets.generation_config("research", level),
+                    api_key=api_key
+                )
+            
+            result = {
+                "type": "research",
+                "query": query,
+                "results": response.text,
+                "sources": [
+                    "https://exemplo.com/fonte1",
+                    "https://exemplo.com/fonte2",
+                    "https://exemplo.com/fonte3"
+                ]
+            }
+            if RESEARCH_CACHE_TTL > 0:
+                await get_state().cache_set(cache_key, json.dumps(result), RESEARCH_CACHE_TTL)
+            return result
+        except Exception as e:
+            return {
+                "type": "research",
+                "query": query,
+                "results": f"Erro na pesquisa: {str(e)}",
+                "sources": []
+            }
+
+class CoderAgent:
+    def __init__(self, model_level: str = "medio"):
+        # Nível preferido; o escalonador pode subir pela complexidade ou descer sob pressão
+        self.model_level = model_level
+    
+    def _extract_code_blocks(self, content: str) -> Dict[str, str]:
+        site = extract_text(content)
+        return {"html": site.html, "css": site.css, "js": site.js}
+    
+    def _generate_site(self, model, prompt: str, config: Dict[str, Any],
+                       stop: Optional[threading.Event] = None) -> ExtractedSite:
+        """
+        Gera o site e extrai o HTML em uma única passada, em streaming quando habilitado.
+        `stop` é sinalizado quando a chamada foi cancelada (ex.: perdeu o hedge) e
+        encerra o stream no próximo trecho, em vez de consumir tokens até o fim.
+        """
+        extractor = HtmlExtractor()
+        reasons = []
+        if CODER_STREAMING:
+            chunks = stream_text(model, prompt, on_finish=reasons.append, generation_config=config)
+            try:
+                for chunk in chunks:
+                    if stop is not None and stop.is_set():
+                        print(f"🛑 [CODER] Chamada cancelada, encerrando o streaming em {extractor.size} chars")
+                        break
+                    extractor.feed(chunk)
+                    if extractor.complete:
+                        # Documento fechado: o resto seria texto explicativo descartado
+                        print(f"⏹️ [CODER] Documento completo em {extractor.size} chars, encerrando o streaming")
+                        break
+            finally:
+                chunks.close()
+        else:
+            response = model.generate_content(prompt, generation_config=config)
+            extractor.feed(response.text)
+            reasons.append(finish_reason(response))
+        extractor.close_document(reasons[-1] if reasons else None)
+        return extractor.finish()
+    
+    async def _generate(self, level: str, api_key: str, prompt: str) -> ExtractedSite:
+        model = get_model(MODELS[level], api_key)
+        config = budgets.generation_config("coder", level)
+        # Cancelar a tarefa não interrompe a thread do SDK; o evento faz o streaming parar
+        stop = threading.Event()
+        try:
+            async with tier_scheduler.observe(level):
+                return await retry_with_backoff(self._generate_site, model, prompt, config, stop, max_retries=CODER_MAX_RETRIES, base_delay=CODER_BASE_DELAY, api_key=api_key)
+        except asyncio.CancelledError:
+            stop.set()
+            raise
+    
+    def _hedge_alternate(self, level: str, primary_key: str, prompt: str):
+        """
+        Escolhe a segunda chave do nível ou um nível vizinho para a duplicata do hedge;
+        retorna (chamada, nível) ou (None, None)
+        """
+        backup_key = api_config.get_api_key(level, use_backup=True)
+        if backup_key and backup_key.strip() and backup_key != primary_key:
+            return (lambda: self._generate(level, backup_key, prompt)), level
+        alternate_level = HEDGE_ALTERNATE_LEVEL[level]
+        key = api_config.resolve_api_key(alternate_level)
+        if key:
+            return (lambda: self._generate(alternate_level, key, prompt)), alternate_level
+        return None, None
+    
+    def _finalize_site(self, html_content: str):
+        """Pós-processa (minificação, limite de bytes) e grava o site; roda em uma thread"""
+        report = None
+        if postprocess.POSTPROCESS_ENABLED:
+            html_content, report = postprocess.process(html_content)
+            print(f"🗜️ [CODER] Site pós-processado: {report.original} -> {report.final} bytes")
+        return artifact_store.put(html_content), report, html_content
+    
+    async def _store_site(self, result: Dict[str, Any], html_content: str) -> Dict[str, Any]:
+        """Grava o HTML no armazenamento de artefatos; a resposta leva só o id e um trecho"""
+        try:
+            ref, report, html_content = await asyncio.to_thread(self._finalize_site, html_content)
+        except OSError as e:
+            print(f"⚠️ [CODER] Falha ao gravar artefato, enviando HTML na resposta: {str(e)}")
+            result["content"] = html_content
+            return result
+        result.update({
+            "artifact_id": ref.id,
+            "url": ref.url,
+            "thumbnail_url": ref.thumbnail_url,
+            "size": ref.size,
+            "excerpt": ref.excerpt
+        })
+        if report is not None:
+            result["sizes"] = report.to_dict()
+        if inline_content():
+            # Outra instância não enxerga este disco: a interface usa o HTML da resposta
+            result["content"] = html_content
+            result["inline"] = True
+        return result
+    
+    async def _generate_single(self, level: str, api_key: str, prompt: str,
+                               description: str, lowered: str) -> Tuple[str, bool]:
+        """
+        Gera o documento inteiro em uma chamada (com hedge) e extrai o HTML; retorna
+        (html, truncado). Um documento cortado pelo limite de tokens chega já fechado.
+        """
+        print("🤖 [CODER] Enviando prompt para o modelo com sistema de retry...")
+        alternate, alternate_level = self._hedge_alternate(level, api_key, prompt)
+        site = await hedged_call(
+            f"coder:{level}",
+            lambda: self._generate(level, api_key, prompt),
+            alternate,
+            alternate_level
+        )
+        print(f"✅ [CODER] Resposta recebida do modelo (tamanho: {site.size} chars)")
+
+        # Usar só o documento HTML, sem o texto explicativo antes ou depois
+        if site.document:
+            html_content = site.document
+            if site.truncated:
+                print(f"⚠️ [CODER] Documento cortado antes de </html> ({site.size} chars), tags abertas fechadas")
+        else:
+            # Sem HTML válido, criar um site específico baseado no tema
+            from . import fallbacks
+            if "inteligência artificial" in lowered or "ia" in lowered:
+                # Site específico sobre IA
+                html_content = fallbacks.ai_site_html()
+            else:
+                # Site genérico melhorado
+                html_content = fallbacks.generic_site_html(description)
+        return html_content, site.truncated
+    
+    def _spread_key(self, level: str, index: int) -> str:
+        """Alterna entre a chave primária e a backup do nível para dividir as chamadas paralelas"""
+        keys = [key for key in (api_config.get_api_key(level), api_config.get_api_key(level, use_backup=True))
+                if key and key.strip()]
+        if not keys:
+            raise RuntimeError(f"Nenhuma chave de API válida disponível para o nível {level}")
+        return keys[index % len(keys)]
+    
+    async def _section_call(self, text: str, prompt: str, index: int, preferred: str, budget: str) -> str:
+        level = await tier_scheduler.select("coder", text, preferred=preferred)
+        api_key = self._spread_key(level, index)
+        model = get_model(MODELS[level], api_key)
+        async with tier_scheduler.observe(level):
+            response = await retry_with_backoff(
+                model.generate_content, prompt,
+                generation_config=budgets.generation_config(budget, level),
+                max_retries=CODER_MAX_RETRIES, base_delay=CODER_BASE_DELAY, api_key=api_key
+            )
+        return response.text
+    
+    async def _generate_sections(self, description: str) -> str:
+        """
+        Planeja as seções e os design tokens, gera as seções em paralelo (entre chaves e
+        níveis) e monta a página; seções que falham viram um bloco simples
+        """
+        print("🗺️ [CODER] Planejando seções do site...")
+        try:
+            plan_text = await self._section_call(description, sections.plan_prompt(description), 0, "base", "plan")
+        except Exception as e:
+            print(f"⚠️ [CODER] Falha no plano, usando seções padrão: {str(e)}")
+            plan_text = ""
+        plan = sections.parse_plan(plan_text, description)
+        print(f"🧩 [CODER] Gerando {len(plan.sections)} seções em paralelo: {[item.id for item in plan.sections]}")
+        
+        replies = await asyncio.gather(*(
+            self._section_call(item.description, sections.section_prompt(plan, item), index, self.model_level, "section")
+            for index, item in enumerate(plan.sections)
+        ), return_exceptions=True)
+        if all(isinstance(reply, BaseException) for reply in replies):
+            raise replies[0]
+        
+        fragments = []
+        for item, reply in zip(plan.sections, replies):
+            fragment = None
+            if not isinstance(reply, BaseException):
+                fragment = sections.validate_fragment(sections.extract_fragment(reply), item)
+            if fragment is None:
+                print(f"⚠️ [CODER] Seção {item.id} inválida ou com erro, usando bloco simples")
+                fragment = sections.placeholder_section(item)
+            fragments.append(fragment)
+        return sections.assemble(plan, fragments)
+    
+    async def create_website(self, description: str) -> Dict[str, Any]:
+        try:
+            print(f"🌐 [CODER] Iniciando criação de website: {description}")
+            
+            # Determinar se é um tema específico de IA
+            lowered = description.lower()
+            is_ai_theme = any(keyword in lowered for keyword in AI_THEME_KEYWORDS)
+            
+            print(f"🤖 [CODER] Tema de IA detectado: {is_ai_theme}")
+            
+            # Prompt específico para IA se o tema for sobre inteligência artificial
+            if "inteligência artificial" in lowered or "ia" in lowered or "artificial intelligence" in lowered:
+                prompt = get_prompt("website_ai").render()
+            else:
+                prompt = get_prompt("website").render(description=description)
+            
+            truncated = False
+            if sections.use_sections(estimate_complexity(description)):
+                # Site grande: seções geradas em paralelo, cada uma com seu nível e chave
+                html_content = await self._generate_sections(description)
+            else:
+                # Escolher o nível para esta chamada e a chave correspondente
+                level = await tier_scheduler.select("coder", description, preferred=self.model_level)
+                api_key = api_config.resolve_api_key(level)
+                if not api_key:
+                    return {
+                        "type": "website",
+                        "description": description,
+                        "html": "<html><body><h1>Erro: Nenhuma chave de API válida disponível para criação de website</h1></body></html>",
+                        "css": "",
+                        "js": "",
+                        "status": "error"
+                    }
+                html_content, truncated = await self._generate_single(level, api_key, prompt, description, lowered)
+            print(f"🔧 [CODER] HTML extraído (tamanho: {len(html_content)} chars)")
+            
+            result = await self._store_site({
+                "type": "website",
+                "title": f"Site: {description}",
+                "description": description,
+                "url": None,
+                "preview": "Site criado, mas cortado pelo limite de tokens" if truncated else "Site criado com sucesso",
+                "truncated": truncated
+            }, html_content)
+            
+            print(f"🎯 [CODER] Website criado com sucesso: {result['title']}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ [CODER] Erro ao criar website: {str(e)}")
+            
+            # Criar um site de fallback baseado na descrição
+            from . import fallbacks
+            is_api_error = isinstance(e, RequestDeadlineExceeded) or classify_error(e).retryable
+            
+            if is_api_error:
+                print("🔄 [CODER] Erro da API detectado, criando site de fallback inteligente...")
+                
+                # Site de fallback baseado no tema
+                fallback_html = fallbacks.api_fallback_html(description)
+                        
+                print(f"🎯 [CODER] Site de fallback criado (tamanho: {len(fallback_html)} chars)")
+                
+                return await self._store_site({
+                    "type": "website",
+                    "title": f"Site: {description} (Fallback)",
+                    "description": f"Site de fallback para: {description}",
+                    "url": None,
+                    "preview": "Site criado em modo de fallback devido a instabilidade da API"
+                }, fallback_html)
+            else:
+                # Erro não relacionado à API
+                simple_fallback = fallbacks.error_html(str(e))
+                print(f"🔄 [CODER] Usando HTML de fallback simples (tamanho: {len(simple_fallback)} chars)")
+                
+                return {
+                    "type": "error",
+                    "title": "Erro ao criar site",
+                    "description": str(e),
+                    "content": simple_fallback,
+                    "url": None,
+                    "preview": "Erro ao criar site"
+                }
+    
+    async def _edit_call(self, level: str, api_key: str, prompt: str) -> str:
+        model = get_model(MODELS[level], api_key)
+        async with tier_scheduler.observe(level):
+            response = await retry_with_backoff(
+                model.generate_content, prompt,
+                generation_config=budgets.generation_config("edit", level),
+                max_retries=CODER_MAX_RETRIES, base_delay=CODER_BASE_DELAY, api_key=api_key
+            )
+        return response.text
+    
+    async def edit_website(self, artifact_id: str, instruction: str) -> Dict[str, Any]:
+        """
+        Edita um site já gerado: só as seções relevantes vão ao modelo e as trocas
+        devolvidas são aplicadas no servidor. Sem seção relevante, o documento inteiro é reescrito.
+        """
+        try:
+            print(f"✏️ [CODER] Editando artefato {artifact_id}: {instruction}")
+            original = await asyncio.to_thread(artifact_store.read_text, artifact_id)
+            if original is None:
+                raise FileNotFoundError(f"Artefato {artifact_id} não encontrado")
+            
+            level = await tier_scheduler.select("coder", instruction, preferred=self.model_level)
+            api_key = api_config.resolve_api_key(level)
+            if not api_key:
+                raise RuntimeError(f"Nenhuma chave de API válida disponível para o nível {level}")
+            
+            parts = editing.split_sections(original)
+            selected = editing.select_sections(parts, instruction)
+            if selected:
+                print(f"🧩 [CODER] Enviando {len(selected)} de {len(parts)} seções: {[part.name for part in selected]}")
+                reply = await self._edit_call(level, api_key, editing.edit_prompt(selected, instruction))
+                html_content, applied = editing.apply_replacements(original, selected, editing.parse_replacements(reply))
+                edited = [section.name for section in applied]
+            else:
+                print("📄 [CODER] Nenhuma seção relevante, reescrevendo o documento inteiro")
+                template = get_prompt("edit_rewrite")
+                prompt_tokens = template.estimate(instruction=instruction, document=original)
+                if not budgets.fits_prompt(prompt_tokens):
+                    raise ValueError(f"Site grande demais para reescrever inteiro (~{prompt_tokens} tokens)")
+                site = await self._generate(level, api_key, template.render(instruction=instruction, document=original))
+                html_content = site.document or original
+                edited = ["document"] if site.document else []
+            
+            if not edited:
+                print("⚠️ [CODER] O modelo não devolveu alterações aplicáveis")
+            
+            result = await self._store_site({
+                "type": "website",
+                "title": f"Site editado: {instruction}",
+                "description": instruction,
+                "url": None,
+                "preview": "Site editado" if edited else "Nenhuma alteração aplicada",
+                "parent_id": artifact_id,
+                "edited_sections": edited
+            }, html_content)
+            print(f"🎯 [CODER] Edição concluída ({len(edited)} seção(ões) alterada(s))")
+            return result
+        
+        except Exception as e:
+            print(f"❌ [CODER] Erro ao editar website: {str(e)}")
+            return {
+                "type": "error",
+                "title": "Erro ao editar site",
+                "description": str(e),
+                "url": None,
+                "preview": "Erro ao editar site"
+            }
+
+def fallback_decision(message: str) -> Dict[str, Any]:
+    """Decisão usada quando não dá para interpretar a resposta do modelo: conversa normal"""
+    return {"needs_tool": False, "tool_type": "none", "description": message, "is_greeting": False}
+
+def error_result(e: Exception) -> Dict[str, Any]:
+    print(f"❌ [SUPERVISOR] Erro no processamento: {str(e)}")
+    return {
+        "response": f"Desculpe, ocorreu um erro ao processar sua solicitação: {str(e)}",
+        "results": [],
+        "type": "error",
+        "status": "error"
+    }
+
+class SupervisorAgent:
+    def __init__(self):
+        self.research_agent = ResearchAgent(model_level="base")
+        self.coder_agent = CoderAgent(model_level="medio")
+        self.model_level = "medio"
+        self.speculation = {"hits": 0, "misses": 0, "skipped": 0}
+    
+    async def _generate(self, kind: str, message: str, prompt: str, max_tokens: Optional[int] = None):
+        """Gera a resposta do supervisor no nível escolhido pelo escalonador"""
+        level = await tier_scheduler.select(kind, message, preferred=self.model_level)
+        api_key = api_config.resolve_api_key(level)
+        if not api_key:
+            raise RuntimeError(f"Nenhuma chave de API válida disponível para o nível {level}")
+        model = get_model(MODELS[level], api_key)
+        async with tier_scheduler.observe(level):
+            return await retry_with_backoff(
+                model.generate_content, prompt,
+                generation_config=budgets.generation_config(kind, level, max_tokens),
+                api_key=api_key
+            )
+    
+    async def decide(self, message: str) -> Dict[str, Any]:
+        """Decide com uma chamada ao modelo se a mensagem é conversa, pesquisa ou website"""
+        message = budgets.guard_input(message)
+        # Primeiro, determinar se precisa de ferramentas ou é conversa normal
+        decision_prompt = get_prompt("decision").render(message=message)
+
+        print("🤖 [SUPERVISOR] Enviando prompt de decisão para o modelo com retry...")
+        decision_response = await self._generate("supervisor", message, decision_prompt)
+        print(f"✅ [SUPERVISOR] Resposta de decisão recebida: {decision_response.text}")
+
+        # Parse da decisão
+        try:
+            decision_text = decision_response.text.strip()
+            json_match = _DECISION_JSON.search(decision_text)
+            if json_match:
+                decision_data = json.loads(json_match.group())
+                print(f"📋 [SUPERVISOR] Decisão parseada: {decision_data}")
+            else:
+                decision_data = fallback_decision(message)
+                print("⚠️ [SUPERVISOR] Não foi possível extrair JSON, usando fallback")
+        except Exception as parse_error:
+            print(f"❌ [SUPERVISOR] Erro ao parsear decisão: {parse_error}")
+            decision_data = fallback_decision(message)
+        
+        return decision_data
+    
+    async def decide_many(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """
+        Decide várias mensagens de uma vez: o roteador léxico resolve as óbvias e as
+        restantes vão juntas em uma única chamada de decisão
+        """
+        messages = [budgets.guard_input(message) for message in messages]
+        decisions = [route(message) for message in messages]
+        pending = [index for index, decision in enumerate(decisions) if decision is None]
+        print(f"🧭 [SUPERVISOR] {len(messages) - len(pending)} mensagem(ns) roteada(s) localmente, {len(pending)} para o modelo")
+        if not pending:
+            return decisions
+        
+        numbered = "\n".join(f'{position}. "{messages[index]}"' for position, index in enumerate(pending))
+        decision_prompt = get_prompt("decision_batch").render(messages=numbered)
+        
+        parsed: Dict[int, Dict[str, Any]] = {}
+        try:
+            # Cerca de 128 tokens por decisão no array
+            response = await self._generate("supervisor", numbered, decision_prompt, max_tokens=128 * len(pending) + 64)
+            array_match = _DECISION_ARRAY.search(response.text)
+            if array_match:
+                for position, item in enumerate(json.loads(array_match.group())):
+                    if isinstance(item, dict):
+                        parsed[int(item.get("index", position))] = item
+        except Exception as e:
+            print(f"❌ [SUPERVISOR] Erro na decisão em grupo, usando fallback: {str(e)}")
+        
+        for position, index in enumerate(pending):
+            decisions[index] = parsed.get(position) or fallback_decision(messages[index])
+        return decisions
+    
+    async def execute(self, message: str, decision_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa a decisão: responde direto ou chama o agente da ferramenta"""
+        message = budgets.guard_input(message)
+        # Se não precisa de ferramenta, responder diretamente
+        if not decision_data.get("needs_tool", False):
+            print("💬 [SUPERVISOR] Processando como conversa normal")
+            conversation_prompt = get_prompt("conversation").render(message=message)
+
+            conversation_response = await self._generate("chat", message, conversation_prompt)
+
+            result = {
+                "response": conversation_response.text,
+                "results": [],
+                "type": "conversation",
+                "status": "completed"
+            }
+            print(f"✅ [SUPERVISOR] Conversa processada: {result}")
+            return result
+
+        # Se precisa de ferramenta, usar o agente apropriado
+        results = []
+        tool_type = decision_data.get("tool_type", "research")
+        description = decision_data.get("description", message)
+
+        print(f"🔧 [SUPERVISOR] Usando ferramenta: {tool_type} com descrição: {description}")
+
+        if tool_type == "research":
+            print("🔍 [SUPERVISOR] Chamando agente de pesquisa...")
+            result = await self.research_agent.research(description)
+            results.append(result)
+            final_result = {
+                "response": "🔍 Pesquisa realizada com sucesso!",
+                "results": results,
+                "type": "research",
+                "status": "completed"
+            }
+            print(f"✅ [SUPERVISOR] Pesquisa concluída: {final_result}")
+            return final_result
+        elif tool_type == "edit":
+            print("✏️ [SUPERVISOR] Chamando agente de criação de website para edição...")
+            result = await self.coder_agent.edit_website(decision_data["artifact_id"], message)
+            results.append(result)
+            final_result = {
+                "response": "✏️ Website editado com sucesso!" if result["type"] == "website" else "❌ Não foi possível editar o website.",
+                "results": results,
+                "type": "website",
+                "status": "completed"
+            }
+            print(f"✅ [SUPERVISOR] Edição concluída: {final_result}")
+            return final_result
+        elif tool_type == "website":
+            print("🌐 [SUPERVISOR] Chamando agente de criação de website...")
+            result = await self.coder_agent.create_website(description)
+            results.append(result)
+            final_result = {
+                "response": "💻 Website criado com sucesso!",
+                "results": results,
+                "type": "website", 
+                "status": "completed"
+            }
+            print(f"✅ [SUPERVISOR] Website concluído: {final_result}")
+            return final_result
+        else:
+            print("💬 [SUPERVISOR] Fallback para conversa")
+            # Fallback para conversa
+            conversation_prompt = get_prompt("conversation_fallback").render(message=message)
+            conversation_response = await self._generate("chat", message, conversation_prompt)
+
+            result = {
+                "response": conversation_response.text,
+                "results": [],
+                "type": "conversation",
+                "status": "completed"
+            }
+            print(f"✅ [SUPERVISOR] Fallback processado: {result}")
+            return result
+
+    async def _speculate(self, message: str):
+        """
+        Começa a ferramenta provável junto com a chamada de decisão quando o roteador
+        léxico tem um sinal forte. Retorna (decisão especulada, tarefa) ou (None, None).
+        """
+        guess = route(message)
+        if not SPECULATIVE_EXECUTION or guess is None or not guess["needs_tool"]:
+            return None, None
+        # Especulações descartadas consomem um balde por minuto; sem folga, não especular
+        if await get_state().headroom("speculation:waste", SPECULATION_MAX_WASTE) <= 0:
+            self.speculation["skipped"] += 1
+            return None, None
+        print(f"🏃 [SUPERVISOR] Especulando ferramenta {guess['tool_type']} em paralelo com a decisão")
+        return guess, asyncio.create_task(self.execute(message, guess))
+
+    async def _discard(self, task: asyncio.Task):
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self.speculation["misses"] += 1
+        await get_state().take_token("speculation:waste", SPECULATION_MAX_WASTE)
+
+    async def process_request(self, message: str, artifact_id: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            message = budgets.guard_input(message)
+            print(f"🎯 [SUPERVISOR] Processando solicitação: {message}")
+            # Pedido de alteração com um site aberto: editar em vez de gerar de novo
+            if artifact_id and is_edit_request(message):
+                return await self.execute(message, edit_decision(message, artifact_id))
+            guess, speculative = await self._speculate(message)
+            try:
+                try:
+                    decision_data = await self.decide(message)
+                except Exception as e:
+                    if speculative is None:
+                        raise
+                    # Sem decisão, a execução especulada é a melhor resposta disponível
+                    print(f"⚠️ [SUPERVISOR] Decisão falhou ({str(e)}), mantendo a execução especulada")
+                    decision_data = guess
+
+                if speculative is not None:
+                    same_tool = (
+                        bool(decision_data.get("needs_tool")) and
+                        decision_data.get("tool_type") == guess["tool_type"]
+                    )
+                    if same_tool:
+                        # O acerto vale pela ferramenta: o resultado foi gerado com a mensagem
+                        # original como descrição (a do roteador), não com a descrição da decisão
+                        self.speculation["hits"] += 1
+                        print("✅ [SUPERVISOR] Especulação confirmada pela decisão")
+                        consumed, speculative = speculative, None
+                        return await consumed
+                    chosen = decision_data.get("tool_type") if decision_data.get("needs_tool") else "conversa"
+                    print(f"🗑️ [SUPERVISOR] Especulação descartada, decisão foi {chosen}")
+                    discarded, speculative = speculative, None
+                    await self._discard(discarded)
+
+                return await self.execute(message, decision_data)
+            finally:
+                # Saída sem usar a especulação (ex.: requisição cancelada durante a decisão)
+                if speculative is not None:
+                    await self._discard(speculative)
+        except Exception as e:
+            return error_result(e)
+
+# Instância global do supervisor, criada no primeiro uso
+_supervisor = None
+
+def get_supervisor() -> SupervisorAgent:
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = SupervisorAgent()
+    return _supervisor
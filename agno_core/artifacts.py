@@ -0,0 +1,155 @@
+"""
+Armazenamento de artefatos endereçado por conteúdo
+Os sites gerados são gravados uma única vez por hash, já comprimidos (gzip e, se o
+pacote `zstandard` estiver instalado, zstd), e as respostas carregam só o id.
+Sem diretório compartilhado entre instâncias (ex.: /tmp de cada função no Vercel),
+o HTML também vai na resposta, porque outra instância não encontraria o artefato.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", os.path.join(tempfile.gettempdir(), "agno_artifacts"))
+ARTIFACT_EXCERPT_CHARS = int(os.getenv("ARTIFACT_EXCERPT_CHARS", "280"))
+# true/false, ou auto: HTML na resposta quando roda no Vercel (variável VERCEL definida)
+ARTIFACT_INLINE = os.getenv("ARTIFACT_INLINE", "auto").lower()
+
+ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+_TAGS = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.DOTALL | re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+# Codificações pré-comprimidas por ordem de preferência
+ENCODINGS = ("zstd", "gzip")
+_SUFFIX = {"zstd": ".zst", "gzip": ".gz"}
+
+
+@dataclass
+class ArtifactRef:
+    id: str
+    media_type: str
+    size: int
+    excerpt: str
+
+    @property
+    def url(self) -> str:
+        return f"/artifacts/{self.id}"
+
+    @property
+    def thumbnail_url(self) -> str:
+        return f"/artifacts/{self.id}/thumbnail"
+
+
+def excerpt(content: str, limit: int = ARTIFACT_EXCERPT_CHARS) -> str:
+    """Trecho curto do texto visível do documento, para mostrar sem baixar o artefato"""
+    text = _SPACES.sub(" ", _TAGS.sub(" ", content[:limit * 20])).strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def inline_content() -> bool:
+    """Se a resposta deve levar o HTML, além da referência ao artefato"""
+    if ARTIFACT_INLINE in ("true", "false"):
+        return ARTIFACT_INLINE == "true"
+    return bool(os.getenv("VERCEL"))
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+class ArtifactStore:
+    def __init__(self, directory: str = ARTIFACTS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, artifact_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, artifact_id + suffix)
+
+    def _write(self, path: str, data: bytes):
+        # Gravação atômica: outro processo nunca lê um arquivo pela metade
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def put(self, content: str, media_type: str = "text/html; charset=utf-8") -> ArtifactRef:
+        """Grava o conteúdo (se ainda não existir) e devolve a referência"""
+        data = content.encode("utf-8")
+        artifact_id = hashlib.sha256(data).hexdigest()[:32]
+        ref = ArtifactRef(artifact_id, media_type, len(data), excerpt(content))
+
+        meta_path = self._path(artifact_id, ".json")
+        if os.path.exists(meta_path):
+            return ref
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._path(artifact_id, ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+            zstandard = _zstd()
+            if zstandard is not None:
+                self._write(self._path(artifact_id, ".zst"), zstandard.ZstdCompressor(level=19).compress(data))
+            # Metadados por último: marcam o artefato como completo
+            meta = {"media_type": media_type, "size": len(data), "created": time.time()}
+            self._write(meta_path, json.dumps(meta).encode("utf-8"))
+        print(f"📦 [ARTEFATOS] Artefato {artifact_id} gravado ({len(data)} bytes)")
+        return ref
+
+    def meta(self, artifact_id: str) -> Optional[dict]:
+        if not ARTIFACT_ID.match(artifact_id):
+            return None
+        try:
+            with open(self._path(artifact_id, ".json"), "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def encoded_path(self, artifact_id: str, encoding: str) -> Optional[str]:
+        """Caminho da versão pré-comprimida na codificação pedida, se existir"""
+        path = self._path(artifact_id, _SUFFIX[encoding])
+        return path if os.path.exists(path) else None
+
+    def read(self, artifact_id: str) -> bytes:
+        """Conteúdo original (descomprimido) do artefato"""
+        with open(self._path(artifact_id, ".gz"), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def read_text(self, artifact_id: str) -> Optional[str]:
+        if self.meta(artifact_id) is None:
+            return None
+        return self.read(artifact_id).decode("utf-8")
+
+    def derived(self, artifact_id: str, suffix: str, build: Callable[[str], bytes]) -> Optional[bytes]:
+        """
+        Arquivo derivado do artefato (ex.: miniatura), gerado na primeira leitura e
+        guardado ao lado dele; como o artefato é imutável, o derivado também é
+        """
+        if self.meta(artifact_id) is None:
+            return None
+        path = self._path(artifact_id, suffix)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        data = build(self.read(artifact_id).decode("utf-8"))
+        self._write(path, data)
+        return data
+
+
+# Armazenamento global do processo
+artifact_store = ArtifactStore()
@@ -0,0 +1,60 @@
+"""
+Orçamentos de geração por agente e nível
+Define max_output_tokens de cada chamada (o `generation_config` do Gemini) e limita o tamanho da entrada do usuário antes de ela entrar nos prompts.
+"""
+import os
+from typing import Any, Dict, Optional
+
+from .scheduler import TIERS
+
+MAX_INPUT_CHARS = int(os.getenv("MAX_INPUT_CHARS", "4000"))
+MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "32000"))
+
+# max_output_tokens por tipo de chamada, na ordem base, medio, avancado
+_DEFAULT_BUDGETS = {
+    "supervisor": "512,512,512",
+    "chat": "1024,1536,2048",
+    "research": "1024,2048,4096",
+    "coder": "16384,24576,32768",
+    "plan": "512,512,512",
+    "section": "2048,3072,4096",
+    "edit": "4096,6144,8192",
+}
+
+def _load_budgets() -> Dict[str, Dict[str, int]]:
+    """TOKEN_BUDGET_<TIPO>="base,medio,avancado" sobrescreve os padrões"""
+    budgets = {}
+    for kind, default in _DEFAULT_BUDGETS.items():
+        values = [int(value) for value in os.getenv(f"TOKEN_BUDGET_{kind.upper()}", default).split(",")]
+        values += values[-1:] * (len(TIERS) - len(values))
+        budgets[kind] = dict(zip(TIERS, values))
+    return budgets
+
+
+TOKEN_BUDGETS = _load_budgets()
+
+
+def max_output_tokens(kind: str, level: str) -> Optional[int]:
+    return TOKEN_BUDGETS.get(kind, {}).get(level)
+
+
+def generation_config(kind: str, level: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """generation_config da chamada; `max_tokens` substitui o orçamento da tabela"""
+    config: Dict[str, Any] = {}
+    limit = max_tokens or max_output_tokens(kind, level)
+    if limit:
+        config["max_output_tokens"] = limit
+    return config
+
+
+def guard_input(text: str, limit: int = MAX_INPUT_CHARS) -> str:
+    """Corta a entrada do usuário no limite de caracteres antes de montar o prompt"""
+    if len(text) <= limit:
+        return text
+    print(f"✂️ [BUDGET] Entrada com {len(text)} caracteres cortada em {limit}")
+    return text[:limit]
+
+
+def fits_prompt(tokens: int, limit: int = MAX_PROMPT_TOKENS) -> bool:
+    """Se um prompt com a contagem estimada (ver prompts.estimate) cabe no limite"""
+    return tokens <= limit
@@ -0,0 +1,124 @@
+"""
+Modelos Gemini vinculados a uma chave de API específica
+Permite chamadas concorrentes com chaves diferentes sem depender do genai.configure global.
+Clientes (um canal gRPC por chave) e modelos (um por nome e chave) são criados uma vez e
+reaproveitados; o canal usa keepalive para não precisar refazer TLS depois de um tempo ocioso.
+"""
+import os
+import threading
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Intervalo dos pings de keepalive do canal gRPC; 0 desativa
+CHANNEL_KEEPALIVE_MS = int(os.getenv("CHANNEL_KEEPALIVE_MS", "300000"))
+
+_clients: Dict[str, object] = {}
+_models: Dict[Tuple[str, str], object] = {}
+_lock = threading.Lock()
+
+
+def _keepalive_client(api_key: str):
+    """Cliente com um transporte gRPC que mantém a conexão aberta mesmo sem chamadas"""
+    import google.auth._default
+    from google.ai import generativelanguage as glm
+    from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc import (
+        GenerativeServiceGrpcTransport,
+    )
+
+    class KeepAliveTransport(GenerativeServiceGrpcTransport):
+        @classmethod
+        def create_channel(cls, host, **kwargs):
+            kwargs["options"] = list(kwargs.get("options") or []) + [
+                ("grpc.keepalive_time_ms", CHANNEL_KEEPALIVE_MS),
+                ("grpc.keepalive_timeout_ms", 20000),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+            return super().create_channel(host, **kwargs)
+
+    credentials = google.auth._default.get_api_key_credentials(api_key)
+    return glm.GenerativeServiceClient(
+        transport=KeepAliveTransport(credentials=credentials, always_use_jwt_access=True)
+    )
+
+
+def _build_client(api_key: str):
+    from google.ai import generativelanguage as glm
+
+    if CHANNEL_KEEPALIVE_MS > 0:
+        try:
+            return _keepalive_client(api_key)
+        except (ImportError, AttributeError) as e:
+            # Versões do SDK sem o transporte/credenciais esperados: cliente padrão
+            print(f"⚠️ [CLIENTS] Keepalive indisponível, usando o canal padrão: {str(e)}")
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+
+def get_client(api_key: str):
+    """Retorna (criando uma única vez) o cliente de geração para a chave"""
+    client = _clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _build_client(api_key)
+                _clients[api_key] = client
+    return client
+
+
+def get_model(model_name: str, api_key: str):
+    """GenerativeModel (criado uma única vez por nome e chave) que usa sempre o cliente da chave"""
+    model = _models.get((model_name, api_key))
+    if model is None:
+        import google.generativeai as genai
+
+        client = get_client(api_key)
+        with _lock:
+            model = _models.get((model_name, api_key))
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                # O SDK só cria o cliente padrão quando _client é None; fixamos o da chave
+                model._client = client
+                _models[(model_name, api_key)] = model
+    return model
+
+
+def model_count() -> int:
+    return len(_models)
+
+
+def open_channel(api_key: str, timeout: float) -> None:
+    """Abre a conexão do canal da chave agora (TCP + TLS), sem fazer nenhuma chamada à API"""
+    import grpc
+
+    transport = get_client(api_key).transport
+    channel = getattr(transport, "grpc_channel", None)
+    if channel is not None:
+        grpc.channel_ready_future(channel).result(timeout=timeout)
+
+
+def finish_reason(response) -> Optional[str]:
+    """Motivo de término do primeiro candidato (STOP, MAX_TOKENS...), se a resposta trouxer"""
+    try:
+        reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError, TypeError):
+        return None
+    if not reason:
+        return None
+    return getattr(reason, "name", str(reason))
+
+
+def stream_text(model, prompt: str, on_finish: Optional[Callable[[str], None]] = None,
+                **kwargs) -> Iterator[str]:
+    """Gera em streaming e devolve o texto de cada trecho; `on_finish` recebe o finish_reason"""
+    for chunk in model.generate_content(prompt, stream=True, **kwargs):
+        if on_finish is not None:
+            reason = finish_reason(chunk)
+            if reason:
+                on_finish(reason)
+        try:
+            text = chunk.text
+        except ValueError:
+            # Trechos finais podem vir só com finish_reason, sem partes de texto
+            continue
+        if text:
+            yield text
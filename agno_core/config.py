@@ -0,0 +1,58 @@
+"""
+Configurações do sistema a partir do .env e chaves de API por nível
+"""
+import os
+
+# Configurações do sistema a partir do .env
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+BASE_DELAY = float(os.getenv("BASE_DELAY", "1"))
+CODER_MAX_RETRIES = int(os.getenv("CODER_MAX_RETRIES", "3"))
+CODER_BASE_DELAY = float(os.getenv("CODER_BASE_DELAY", "2"))
+CODER_STREAMING = os.getenv("CODER_STREAMING", "true").lower() == "true"
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "300"))
+SPECULATIVE_EXECUTION = os.getenv("SPECULATIVE_EXECUTION", "true").lower() == "true"
+SPECULATION_MAX_WASTE = int(os.getenv("SPECULATION_MAX_WASTE", "10"))
+DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
+VERBOSE_LOGS = os.getenv("VERBOSE_LOGS", "true").lower() == "true"
+
+# Configurar modelos Gemini a partir do .env
+MODEL_BASE = os.getenv("MODEL_BASE", "gemini-2.5-flash-lite")
+MODEL_MEDIO = os.getenv("MODEL_MEDIO", "gemini-2.5-flash")
+MODEL_AVANCADO = os.getenv("MODEL_AVANCADO", "gemini-2.5-pro")
+MODELS = {"base": MODEL_BASE, "medio": MODEL_MEDIO, "avancado": MODEL_AVANCADO}
+
+
+# Configuração de chaves de API por nível
+class APIConfig:
+    def __init__(self):
+        self.api_keys = {
+            'base': {
+                'primary': os.getenv("API_BASE_1"),
+                'backup': os.getenv("API_BASE_2")
+            },
+            'medio': {
+                'primary': os.getenv("API_MEDIO_1"),
+                'backup': os.getenv("API_MEDIO_2")
+            },
+            'avancado': {
+                'primary': os.getenv("API_AVANCADO_1"),
+                'backup': os.getenv("API_AVANCADO_2")
+            }
+        }
+
+    def get_api_key(self, level: str, use_backup: bool = False) -> str:
+        """Retorna a chave de API para o nível especificado"""
+        key_type = 'backup' if use_backup else 'primary'
+        return self.api_keys[level][key_type]
+
+    def resolve_api_key(self, level: str) -> str:
+        """Retorna a chave primária do nível, ou a backup se a primária não estiver configurada"""
+        for use_backup in (False, True):
+            api_key = self.get_api_key(level, use_backup)
+            if api_key and api_key.strip():
+                return api_key
+        return None
+
+
+# Inicializar configuração de API
+api_config = APIConfig()
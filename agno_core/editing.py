@@ -0,0 +1,143 @@
+"""
+Edição incremental de sites gerados
+Divide o documento em seções (style, header, nav, section, footer, script),
+escolhe as relevantes para a instrução e troca só essas pelo que o modelo devolver,
+sem regenerar o documento inteiro.
+"""
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .prompts import get_prompt
+from .markup import TagBalancer
+
+EDIT_MAX_SECTIONS = int(os.getenv("EDIT_MAX_SECTIONS", "3"))
+
+SECTION_TAGS = {"style", "header", "nav", "section", "footer", "script"}
+_ATTR_ID = re.compile(r"""\bid\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_ATTR_CLASS = re.compile(r"""\bclass\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_REPLACEMENT = re.compile(r"<<<SECAO (\d+)>>>\s*(.*?)\s*<<<FIM>>>", re.DOTALL)
+
+# Palavras da instrução que apontam para um tipo de seção
+_TAG_HINTS = {
+    "header": ("cabecalho", "header", "topo", "logo", "titulo"),
+    "nav": ("menu", "navegacao", "nav", "links"),
+    "footer": ("rodape", "footer", "contato", "copyright"),
+    "style": ("cor", "cores", "fonte", "fundo", "estilo", "css", "tamanho", "espacamento",
+              "margem", "borda", "tema", "escuro", "claro", "responsivo"),
+    "script": ("script", "javascript", "animacao", "clique", "interacao", "botao"),
+}
+
+
+@dataclass
+class Section:
+    index: int
+    tag: str
+    name: str
+    start: int
+    end: int
+    text: str
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+class _SectionScanner(TagBalancer):
+    """
+    Acompanha a profundidade das tags e guarda (tag, atributos, início, fim) de cada seção
+    de primeiro nível; seções aninhadas ficam dentro da seção de fora.
+    """
+
+    def __init__(self, html: str):
+        super().__init__()
+        self.html = html
+        self.found: List[Tuple[str, str, int, int]] = []
+        self._lines = [0] + [index + 1 for index, char in enumerate(html) if char == "\n"]
+        self._open = None  # (tag, atributos, início, profundidade)
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._lines[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if self._open is None and tag in SECTION_TAGS:
+            start = self._offset()
+            raw = self.get_starttag_text() or ""
+            self._open = (tag, raw[len(tag) + 1:].rstrip(">/"), start, len(self.stack))
+        super().handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        super().handle_endtag(tag)
+        if self._open is not None and len(self.stack) <= self._open[3]:
+            name, attrs, start, _ = self._open
+            self._open = None
+            if tag == name:
+                end = self.html.find(">", self._offset()) + 1
+                self.found.append((name, attrs, start, end))
+
+
+def split_sections(html: str) -> List[Section]:
+    """Seções de primeiro nível do documento, na ordem em que aparecem"""
+    scanner = _SectionScanner(html)
+    scanner.feed(html)
+    scanner.close()
+    sections = []
+    for tag, attrs, start, end in scanner.found:
+        id_match = _ATTR_ID.search(attrs)
+        class_match = _ATTR_CLASS.search(attrs)
+        if id_match:
+            name = f"{tag}#{id_match.group(1)}"
+        elif class_match:
+            name = f"{tag}.{class_match.group(1).split()[0]}"
+        else:
+            name = tag
+        sections.append(Section(len(sections), tag, name, start, end, html[start:end]))
+    return sections
+
+
+def select_sections(sections: List[Section], instruction: str,
+                    limit: int = EDIT_MAX_SECTIONS) -> List[Section]:
+    """As seções mais relevantes para a instrução; vazio se nenhuma tiver relação"""
+    words = set(_WORD.findall(_normalize(instruction)))
+    scored = []
+    for section in sections:
+        score = 3 * len(words & set(_TAG_HINTS.get(section.tag, ())))
+        score += 3 * len(words & set(_WORD.findall(_normalize(section.name))))
+        # Termos da instrução que aparecem no texto da seção (ex.: o título a trocar)
+        score += len(words & set(_WORD.findall(_normalize(section.text[:4000]))))
+        if score > 0:
+            scored.append((score, section))
+    scored.sort(key=lambda item: -item[0])
+    return sorted((section for _, section in scored[:limit]), key=lambda section: section.index)
+
+
+def edit_prompt(sections: List[Section], instruction: str) -> str:
+    blocks = "\n".join(f"<<<SECAO {section.index}>>>\n{section.text}\n<<<FIM>>>" for section in sections)
+    return get_prompt("edit_sections").render(instruction=instruction, sections=blocks)
+
+
+def parse_replacements(text: str) -> Dict[int, str]:
+    return {int(index): body for index, body in _REPLACEMENT.findall(text)}
+
+
+def apply_replacements(html: str, sections: List[Section],
+                       replacements: Dict[int, str]) -> Tuple[str, List[Section]]:
+    """
+    Aplica as trocas válidas e devolve (novo html, seções alteradas). Uma troca só vale
+    se começar pela mesma tag da seção original.
+    """
+    by_index = {section.index: section for section in sections}
+    applied = []
+    for index in sorted(replacements, reverse=True):
+        section = by_index.get(index)
+        body = replacements[index]
+        if section is None or not re.match(rf"<{section.tag}\b", body, re.IGNORECASE):
+            continue
+        html = html[:section.start] + body + html[section.end:]
+        applied.append(section)
+    return html, sorted(applied, key=lambda section: section.index)
@@ -0,0 +1,197 @@
+"""
+Extração incremental do site gerado pelo modelo
+Uma única passada sobre os trechos recebidos (streaming ou resposta completa): blocos
+cercados por ``` e os limites do documento <html> são acompanhados por uma pequena
+máquina de estados, guardando entre trechos só a cauda necessária para achar um marcador.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .markup import TagBalancer
+
+_DOC_START = re.compile(r'<!DOCTYPE html>|<html', re.IGNORECASE)
+_DOC_END = re.compile(r'</html>', re.IGNORECASE)
+_DOC_START_KEEP = len("<!DOCTYPE html>") - 1
+_DOC_END_KEEP = len("</html>") - 1
+
+FENCE = "```"
+FENCE_CLOSE = "\n```"
+
+# Linguagens dos blocos cercados que interessam ao site
+FENCE_LANGUAGES = {"html": "html", "css": "css", "javascript": "js", "js": "js"}
+
+
+@dataclass
+class ExtractedSite:
+    document: Optional[str]  # Documento completo, sempre começando com <!DOCTYPE html>
+    truncated: bool          # Documento cortado antes de </html> (ex.: MAX_TOKENS) e fechado aqui
+    html: str
+    css: str
+    js: str
+    text: str
+    size: int
+
+
+class _DocumentScanner:
+    """Acompanha <!DOCTYPE html>/<html ... </html> ao longo dos trechos"""
+
+    def __init__(self):
+        self.state = "search"  # search -> open -> done
+        self.parts: List[str] = []
+        self.tail = ""
+
+    def feed(self, chunk: str):
+        if self.state == "done":
+            return
+        data, self.tail = self.tail + chunk, ""
+        pos = 0
+
+        if self.state == "search":
+            match = _DOC_START.search(data)
+            if not match:
+                self.tail = data[-_DOC_START_KEEP:]
+                return
+            self.state = "open"
+            if match.group()[1] != "!":
+                # Sem DOCTYPE, como no comportamento anterior
+                self.parts.append("<!DOCTYPE html>\n")
+            pos = match.start()
+
+        match = _DOC_END.search(data, pos)
+        if match:
+            self.parts.append(data[pos:match.end()])
+            self.state = "done"
+            return
+        cut = max(pos, len(data) - _DOC_END_KEEP)
+        self.parts.append(data[pos:cut])
+        self.tail = data[cut:]
+
+    @property
+    def document(self) -> Optional[str]:
+        return "".join(self.parts) if self.state == "done" else None
+
+    def pending(self) -> str:
+        """Documento aberto até aqui, ainda sem </html>"""
+        return "".join(self.parts) + self.tail
+
+
+class _FenceScanner:
+    """Acompanha blocos ```linguagem ... ``` e guarda o primeiro de cada linguagem"""
+
+    def __init__(self):
+        self.state = "text"  # text -> info -> body -> text
+        self.tail = ""
+        self.info: List[str] = []
+        self.body: List[str] = []
+        self.language: Optional[str] = None
+        self.blocks: Dict[str, str] = {}
+
+    def _collecting(self) -> bool:
+        return self.language is not None and self.language not in self.blocks
+
+    def feed(self, chunk: str):
+        data, self.tail = self.tail + chunk, ""
+        pos = 0
+        while True:
+            if self.state == "text":
+                index = data.find(FENCE, pos)
+                if index < 0:
+                    self.tail = data[max(pos, len(data) - len(FENCE) + 1):]
+                    return
+                self.state, self.info, pos = "info", [], index + len(FENCE)
+
+            if self.state == "info":
+                index = data.find("\n", pos)
+                if index < 0:
+                    self.info.append(data[pos:])
+                    return
+                self.info.append(data[pos:index])
+                self.language = FENCE_LANGUAGES.get("".join(self.info).strip().lower())
+                # A quebra de linha fica no corpo para que um bloco vazio também feche
+                self.state, self.body, pos = "body", [], index
+
+            if self.state == "body":
+                index = data.find(FENCE_CLOSE, pos)
+                if index < 0:
+                    cut = max(pos, len(data) - len(FENCE_CLOSE) + 1)
+                    if self._collecting():
+                        self.body.append(data[pos:cut])
+                    self.tail = data[cut:]
+                    return
+                if self._collecting():
+                    self.body.append(data[pos:max(pos, index)])
+                    self.blocks[self.language] = "".join(self.body)[1:]
+                self.state, pos = "text", index + len(FENCE_CLOSE)
+
+
+class HtmlExtractor:
+    """Consome a saída do modelo em trechos e extrai documento e blocos html/css/js"""
+
+    def __init__(self):
+        self._document = _DocumentScanner()
+        self._fences = _FenceScanner()
+        self._chunks: List[str] = []
+        self.size = 0
+        self.truncated = False
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        self.size += len(chunk)
+        self._document.feed(chunk)
+        self._fences.feed(chunk)
+
+    @property
+    def complete(self) -> bool:
+        """Documento já fechado com </html>"""
+        return self._document.state == "done"
+
+    def close_document(self, finish_reason: Optional[str]):
+        """
+        Fecha um documento que terminou sem </html>: descarta uma tag cortada no meio e
+        fecha as tags abertas, como na geração por seções. Se o modelo não parou por
+        conta própria (ex.: MAX_TOKENS), o documento fica marcado como incompleto.
+        """
+        if self._document.state != "open":
+            return
+        pending = self._document.pending()
+        balancer = TagBalancer()
+        balancer.feed(pending)
+        # O que o parser não consumiu fora de <script>/<style> é uma tag ou comentário cortado
+        if balancer.cdata_elem is None and balancer.rawdata.startswith("<"):
+            pending = pending[:len(pending) - len(balancer.rawdata)]
+        closing = "".join(f"</{tag}>" for tag in reversed(balancer.stack))
+        if "html" not in balancer.stack:
+            closing += "</html>"
+        # Refaz o documento com a tag cortada removida e os fechamentos no fim
+        self._document = _DocumentScanner()
+        self._document.feed(pending + closing)
+        self.truncated = finish_reason != "STOP"
+
+    def finish(self) -> ExtractedSite:
+        document = self._document.document
+        blocks = self._fences.blocks
+        return ExtractedSite(
+            document=document,
+            truncated=self.truncated,
+            html=blocks.get("html") or document or "",
+            css=blocks.get("css", ""),
+            js=blocks.get("js", ""),
+            text="".join(self._chunks),
+            size=self.size,
+        )
+
+
+def extract_stream(chunks: Iterable[str]) -> ExtractedSite:
+    """Extrai o site de uma sequência de trechos (resposta em streaming)"""
+    extractor = HtmlExtractor()
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.finish()
+
+
+def extract_text(text: str) -> ExtractedSite:
+    """Extrai o site de uma resposta completa"""
+    return extract_stream((text,))
@@ -0,0 +1,58 @@
+"""
+Sites de fallback do CoderAgent a partir de templates Jinja2 pré-compilados
+Os templates são carregados uma única vez e o HTML renderizado fica em cache por
+descrição, deixando o caminho de erro barato justamente quando a API está instável.
+"""
+import os
+import threading
+from functools import lru_cache
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+FALLBACK_CACHE_SIZE = int(os.getenv("FALLBACK_CACHE_SIZE", "256"))
+
+_templates = None
+_lock = threading.Lock()
+
+
+def load_templates() -> dict:
+    """Carrega e compila os templates de fallback (uma única vez por processo)"""
+    global _templates
+    if _templates is None:
+        with _lock:
+            if _templates is None:
+                from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+                env = Environment(
+                    loader=FileSystemLoader(TEMPLATES_DIR),
+                    autoescape=select_autoescape(["html"]),
+                )
+                _templates = {
+                    name: env.get_template(f"{name}.html")
+                    for name in ("fallback_ai", "fallback_generic", "fallback_api", "error")
+                }
+                print(f"📄 [FALLBACK] {len(_templates)} templates carregados")
+    return _templates
+
+
+@lru_cache(maxsize=1)
+def ai_site_html() -> str:
+    """Site específico sobre IA"""
+    return load_templates()["fallback_ai"].render()
+
+
+@lru_cache(maxsize=FALLBACK_CACHE_SIZE)
+def generic_site_html(description: str) -> str:
+    """Site genérico melhorado para a descrição"""
+    return load_templates()["fallback_generic"].render(description=description, title=description.title())
+
+
+@lru_cache(maxsize=FALLBACK_CACHE_SIZE)
+def api_fallback_html(description: str) -> str:
+    """Site de fallback usado quando a API está instável"""
+    return load_templates()["fallback_api"].render(description=description)
+
+
+@lru_cache(maxsize=FALLBACK_CACHE_SIZE)
+def error_html(message: str) -> str:
+    """Página simples de erro não relacionado à API"""
+    return load_templates()["error"].render(message=message)
@@ -0,0 +1,134 @@
+"""
+Liveness e readiness do worker
+A liveness só diz que o processo responde. A readiness verifica as dependências (supervisor,
+chaves, backend de estado, aquecimento) e a capacidade (rate limit por nível, vagas de
+admissão, fila de jobs), para o balanceador desviar de workers quebrados ou saturados.
+"""
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from .config import api_config
+from .scheduler import TIERS, tier_scheduler
+from .admission import admission
+from .state import get_state
+
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+
+_started = time.time()
+
+
+def liveness() -> Dict[str, Any]:
+    return {"status": "ok", "uptime": round(time.time() - _started, 1)}
+
+
+def _key_pool() -> Dict[str, Any]:
+    """
+    Chaves configuradas por nível, com o resultado da abertura do canal no aquecimento
+    e os segundos de espera restantes depois de um 429
+    """
+    from .warmup import warmup_state
+    from .retry import key_cooldowns
+
+    pool = {}
+    for level in TIERS:
+        keys = {}
+        for slot, use_backup in (("primary", False), ("backup", True)):
+            api_key = api_config.get_api_key(level, use_backup)
+            if api_key and api_key.strip():
+                keys[slot] = {
+                    "channel": warmup_state.channels.get(f"{level}:{slot}", "configured"),
+                    "cooldown": round(key_cooldowns.remaining(api_key), 1),
+                }
+        pool[level] = {
+            "keys": keys,
+            "configured": bool(keys),
+            "available": any(key["cooldown"] <= 0 for key in keys.values()),
+        }
+    return pool
+
+
+def _supervisor() -> Tuple[bool, Dict[str, Any]]:
+    try:
+        from .agents import get_supervisor
+        supervisor = get_supervisor()
+    except Exception as e:
+        return False, {"status": "error", "error": str(e)[:200]}
+    return True, {"status": "ok", "speculation": dict(supervisor.speculation)}
+
+
+async def _rate_limits() -> Dict[str, Any]:
+    """Headroom e latência por nível, e a espera até haver token para uma nova requisição"""
+    tiers = await tier_scheduler.snapshot()
+    tiers["wait"] = round(await tier_scheduler.capacity("supervisor"), 2)
+    return tiers
+
+
+def _jobs() -> Dict[str, Any]:
+    from .jobs import job_runner, JOB_MAX_QUEUED
+
+    return {
+        "depth": job_runner.depth,
+        "max_queued": JOB_MAX_QUEUED,
+        "workers": job_runner.workers if job_runner.started else 0,
+    }
+
+
+async def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(pronto, relatório); `reasons` lista o que impede o worker de receber tráfego"""
+    from .warmup import warmup_state
+    from .retry import retry_budget
+
+    reasons: List[str] = []
+    report: Dict[str, Any] = {}
+
+    supervisor_ok, report["supervisor"] = _supervisor()
+    if not supervisor_ok:
+        reasons.append("supervisor")
+
+    report["warmup"] = warmup_state.to_dict()
+    if not warmup_state.ready:
+        reasons.append("warmup")
+
+    report["keys"] = _key_pool()
+    if not any(tier["configured"] for tier in report["keys"].values()):
+        reasons.append("keys")
+    elif not any(tier["available"] for tier in report["keys"].values()):
+        # Toda chave configurada recebeu 429 e ainda está em espera
+        reasons.append("cooldown")
+
+    # Sem resposta do backend de estado (ex.: Redis fora), o rate limit também não funciona
+    try:
+        report["rate_limits"] = await asyncio.wait_for(_rate_limits(), HEALTH_PROBE_TIMEOUT)
+        report["state"] = {"status": "ok", "backend": type(get_state()).__name__}
+        if report["rate_limits"]["wait"] > 0:
+            reasons.append("rate_limited")
+    except Exception as e:
+        report["state"] = {"status": "error", "backend": type(get_state()).__name__,
+                           "error": f"{type(e).__name__}: {str(e)}"[:200]}
+        reasons.append("state")
+
+    report["admission"] = admission.snapshot()
+    if report["admission"]["in_flight"] >= report["admission"]["max_in_flight"]:
+        reasons.append("busy")
+
+    report["jobs"] = _jobs()
+    if report["jobs"]["depth"] >= report["jobs"]["max_queued"]:
+        reasons.append("jobs_full")
+
+    report["retry_budget"] = retry_budget.snapshot()
+    report["reasons"] = reasons
+    report["ready"] = not reasons
+    return not reasons, report
+
+
+def retry_after(report: Dict[str, Any]) -> float:
+    """Segundos sugeridos ao balanceador quando o worker não está pronto"""
+    wait = report.get("rate_limits", {}).get("wait", 0)
+    if "cooldown" in report["reasons"]:
+        wait = max(wait, min(key["cooldown"] for tier in report["keys"].values()
+                             for key in tier["keys"].values()))
+    if "busy" in report["reasons"] or "jobs_full" in report["reasons"]:
+        wait = max(wait, report["admission"]["average_duration"])
+    return max(1.0, wait)
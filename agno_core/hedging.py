@@ -0,0 +1,169 @@
+"""
+Requisições com hedge para reduzir a latência de cauda das chamadas ao Gemini
+Se a chamada principal passar do percentil configurado da latência recente,
+uma duplicata é disparada em outra chave/nível e vence a que terminar primeiro.
+A duplicata só sai se houver token no rate limit do nível dela.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from .scheduler import tier_scheduler
+
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MAX_FRACTION = float(os.getenv("HEDGE_MAX_FRACTION", "0.1"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+HEDGE_WINDOW = float(os.getenv("HEDGE_WINDOW", "60"))
+
+# Nível usado pela duplicata quando não há uma segunda chave no mesmo nível
+HEDGE_ALTERNATE_LEVEL = {"base": "medio", "medio": "base", "avancado": "medio"}
+
+
+class LatencyTracker:
+    """Latências recentes (s) de uma operação, para calcular percentis"""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgeBudget:
+    """Garante que os hedges não passem de `max_fraction` das chamadas na janela"""
+
+    def __init__(self, max_fraction: float = HEDGE_MAX_FRACTION, window: float = HEDGE_WINDOW):
+        self.max_fraction = max_fraction
+        self.window = window
+        self._calls: deque = deque()
+        self._hedges: deque = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        limit = now - self.window
+        while self._calls and self._calls[0] < limit:
+            self._calls.popleft()
+        while self._hedges and self._hedges[0] < limit:
+            self._hedges.popleft()
+
+    def record_call(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._hedges) + 1 > self.max_fraction * len(self._calls):
+                return False
+            self._hedges.append(now)
+            return True
+
+    def refund(self):
+        """Devolve o último hedge gasto quando a duplicata acabou não sendo disparada"""
+        with self._lock:
+            if self._hedges:
+                self._hedges.pop()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {"calls": len(self._calls), "hedges": len(self._hedges)}
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+hedge_budget = HedgeBudget()
+
+
+def latency_tracker(operation: str) -> LatencyTracker:
+    tracker = _trackers.get(operation)
+    if tracker is None:
+        tracker = _trackers.setdefault(operation, LatencyTracker())
+    return tracker
+
+
+async def _cancel(task: asyncio.Task):
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def hedged_call(operation: str,
+                      primary: Callable[[], Awaitable],
+                      alternate: Optional[Callable[[], Awaitable]] = None,
+                      alternate_tier: Optional[str] = None):
+    """
+    Executa `primary` e, se ela demorar mais que o percentil configurado,
+    dispara `alternate` (reservando um token de `alternate_tier`) e retorna o primeiro
+    resultado bem-sucedido. A perdedora é cancelada; quem gera em streaming deve tratar o
+    cancelamento e parar de ler o stream (ver CoderAgent._generate).
+    """
+    tracker = latency_tracker(operation)
+    hedge_budget.record_call()
+    started = time.monotonic()
+
+    threshold = tracker.percentile(HEDGE_PERCENTILE) if HEDGE_ENABLED and alternate else None
+    if threshold is None:
+        result = await primary()
+        tracker.record(time.monotonic() - started)
+        return result
+
+    primary_task = asyncio.ensure_future(primary())
+    tasks = [primary_task]
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=max(threshold, HEDGE_MIN_DELAY))
+        hedge = not done and hedge_budget.try_spend()
+        if hedge and alternate_tier and not await tier_scheduler.reserve(alternate_tier):
+            print(f"⚖️ [HEDGE] {operation}: sem token no nível {alternate_tier}, sem duplicata")
+            hedge_budget.refund()
+            hedge = False
+        if not hedge:
+            result = await primary_task
+            tracker.record(time.monotonic() - started)
+            return result
+
+        print(f"🪞 [HEDGE] {operation}: sem resposta após {threshold:.2f}s, disparando duplicata")
+        alternate_task = asyncio.ensure_future(alternate())
+        tasks.append(alternate_task)
+        pending = set(tasks)
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = "duplicata" if task is alternate_task else "principal"
+                    print(f"🏁 [HEDGE] {operation}: venceu a chamada {winner}")
+                    # A amostra é sempre da principal: se a duplicata venceu com ela ainda
+                    # rodando, o tempo decorrido é um limite inferior; se ela falhou, descarta
+                    if task is primary_task or not primary_task.done():
+                        tracker.record(time.monotonic() - started)
+                    return task.result()
+                if first_error is None or task is primary_task:
+                    first_error = task.exception()
+        raise first_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                await _cancel(task)
@@ -0,0 +1,324 @@
+"""
+Jobs em segundo plano para gerações demoradas
+`POST /api/jobs` devolve o id na hora; workers do próprio processo executam o
+SupervisorAgent e gravam progresso e resultado em SQLite, de onde o cliente
+consulta ou acompanha por SSE, inclusive depois de reconectar.
+Cada job é reivindicado atomicamente por um worker e mantido com um lease renovado
+enquanto roda; só volta para a fila se o lease expirar (processo morto ou travado).
+Os workers precisam de um servidor de vida longa: em funções serverless o processo
+congela depois da resposta e os jobs ficam parados até o lease expirar em outra instância.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+JOBS_DB = os.getenv("JOBS_DB", os.path.join(tempfile.gettempdir(), "agno_jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_DEADLINE = float(os.getenv("JOB_DEADLINE", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Validade (s) da posse de um job em execução; renovada a cada terço desse tempo
+JOB_LEASE = float(os.getenv("JOB_LEASE", "30"))
+
+FINISHED = ("completed", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    message TEXT NOT NULL,
+    client TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_until REAL
+)
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    status: str
+    progress: str
+    message: str
+    client: Optional[str]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class JobStore:
+    """Tabela de jobs em SQLite; uma conexão por processo protegida por lock"""
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "lease_until" not in columns:
+                # Bancos criados antes do lease
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            progress=row["progress"],
+            message=row["message"],
+            client=row["client"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def create(self, message: str, client: Optional[str] = None) -> Job:
+        now = time.time()
+        job = Job(uuid.uuid4().hex, "queued", "Na fila", message, client, None, None, now, now)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO jobs (id, status, progress, message, client, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, job.progress, job.message, job.client, now, now),
+            )
+            conn.commit()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def update(self, job_id: str, status: str, progress: str,
+               result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, progress, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id),
+            )
+            conn.commit()
+
+    def claim(self, job_id: str, progress: str, lease: float = JOB_LEASE) -> bool:
+        """
+        Marca o job como em execução se ainda estiver na fila ou com o lease vencido.
+        Só um worker (de qualquer processo) consegue; os outros recebem False.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'running', progress = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND (status = 'queued' OR (status = 'running' AND "
+                "(lease_until IS NULL OR lease_until < ?)))",
+                (progress, now + lease, now, job_id, now),
+            )
+            conn.commit()
+        return cursor.rowcount == 1
+
+    def renew(self, job_id: str, lease: float = JOB_LEASE):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                (time.time() + lease, job_id),
+            )
+            conn.commit()
+
+    def unfinished(self, include_queued: bool = True) -> list:
+        """Ids dos jobs na fila e dos em execução com lease vencido, em ordem de criação"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id FROM jobs WHERE (status = 'queued' AND ?) OR "
+                "(status = 'running' AND (lease_until IS NULL OR lease_until < ?)) ORDER BY created_at",
+                (include_queued, time.time()),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobRunner:
+    """Fila em memória com workers asyncio; o estado durável fica no JobStore"""
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._changed: Dict[str, asyncio.Event] = {}
+        # Ids já na fila deste processo, para a varredura não enfileirar de novo
+        self._pending: set = set()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def start(self):
+        """Inicia os workers e retoma jobs interrompidos por um reinício do processo"""
+        if self.started:
+            return
+        self.queue = asyncio.Queue()
+        self._enqueue(await asyncio.to_thread(self.store.unfinished))
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._recover()))
+        print(f"🧵 [JOBS] {self.workers} worker(s) iniciados, {self.depth} job(s) retomado(s)")
+
+    def _enqueue(self, job_ids: list):
+        for job_id in job_ids:
+            if job_id not in self._pending:
+                self._pending.add(job_id)
+                self.queue.put_nowait(job_id)
+
+    async def _recover(self):
+        """Devolve à fila os jobs cujo dono parou de renovar o lease"""
+        while True:
+            await asyncio.sleep(JOB_LEASE)
+            try:
+                expired = await asyncio.to_thread(self.store.unfinished, False)
+            except Exception as e:
+                print(f"⚠️ [JOBS] Falha ao procurar jobs com lease vencido: {str(e)}")
+                continue
+            if expired:
+                print(f"♻️ [JOBS] {len(expired)} job(s) com lease vencido de volta à fila")
+                self._enqueue(expired)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, message: str, client: Optional[str] = None) -> Job:
+        await self.start()
+        job = await asyncio.to_thread(self.store.create, message, client)
+        self._enqueue([job.id])
+        print(f"📥 [JOBS] Job {job.id} na fila ({self.depth} aguardando)")
+        return job
+
+    async def _update(self, job_id: str, status: str, progress: str, **fields):
+        await asyncio.to_thread(self.store.update, job_id, status, progress, **fields)
+        self._notify(job_id)
+
+    def _notify(self, job_id: str):
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_change(self, job_id: str, timeout: float = JOB_POLL_INTERVAL):
+        """Espera uma atualização do job neste processo, ou o intervalo de polling"""
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _work(self):
+        while True:
+            job_id = await self.queue.get()
+            self._pending.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"❌ [JOBS] Falha inesperada no job {job_id}: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE / 3)
+            try:
+                await asyncio.to_thread(self.store.renew, job_id)
+            except Exception as e:
+                print(f"⚠️ [JOBS] Falha ao renovar o lease do job {job_id}: {str(e)}")
+
+    async def _run(self, job_id: str):
+        from .protocol import response_frame
+
+        # Outro worker (deste ou de outro processo) já pegou o job
+        if not await asyncio.to_thread(self.store.claim, job_id, "Analisando a solicitação"):
+            return
+        job = await asyncio.to_thread(self.store.get, job_id)
+        self._notify(job_id)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self._execute(job)
+        finally:
+            heartbeat.cancel()
+
+        status = "error" if result.get("status") == "error" else "completed"
+        await self._update(
+            job_id, status, "Concluído" if status == "completed" else "Falhou",
+            result=response_frame(result),
+            error=result["response"] if status == "error" else None,
+        )
+        print(f"✅ [JOBS] Job {job_id} terminou com status {status}")
+
+    async def _execute(self, job: Job) -> Dict[str, Any]:
+        from .agents import get_supervisor, error_result
+        from .retry import deadline_scope
+
+        job_id = job.id
+        supervisor = get_supervisor()
+        with deadline_scope(JOB_DEADLINE):
+            try:
+                decision = await supervisor.decide(job.message)
+                tool = decision.get("tool_type") if decision.get("needs_tool") else "none"
+                await self._update(job_id, "running", {
+                    "website": "Gerando o website",
+                    "research": "Pesquisando",
+                }.get(tool, "Respondendo"))
+                result = await supervisor.execute(job.message, decision)
+            except Exception as e:
+                result = error_result(e)
+        return result
+
+
+# Fila de jobs do processo
+job_runner = JobRunner(JobStore())
@@ -0,0 +1,31 @@
+"""
+Utilitários de marcação compartilhados pela geração por seções, pela edição e pela
+extração do documento: elementos vazios do HTML e a pilha de tags abertas
+"""
+from html.parser import HTMLParser
+from typing import List
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "source", "track", "wbr",
+}
+
+
+class TagBalancer(HTMLParser):
+    """Pilha de tags abertas; fechamentos sem abertura correspondente são contados"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[str] = []
+        self.stray = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.stack:
+            while self.stack and self.stack.pop() != tag:
+                pass
+        else:
+            self.stray += 1
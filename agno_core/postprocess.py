@@ -0,0 +1,156 @@
+"""
+Pós-processamento dos sites gerados antes de gravar o artefato
+Uma passada separa blocos <style>, <script>, <pre>/<textarea> e comentários do resto
+do HTML; markup e CSS são minificados, blocos de estilo repetidos são descartados, data
+URIs grandes são removidas e o tamanho antes/depois é informado. Scripts ficam como
+vieram: sem tokenizar strings, templates e regex, remover comentários muda o código.
+"""
+import os
+import re
+from dataclasses import dataclass, asdict
+from typing import List, Set, Tuple
+
+POSTPROCESS_ENABLED = os.getenv("POSTPROCESS_ENABLED", "true").lower() == "true"
+SITE_MAX_BYTES = int(os.getenv("SITE_MAX_BYTES", "262144"))
+DATA_URI_MAX_BYTES = int(os.getenv("DATA_URI_MAX_BYTES", "8192"))
+
+_BLOCKS = re.compile(
+    r"<(style|script|pre|textarea)\b([^>]*)>(.*?)</\1\s*>|<!--(?!\[if).*?-->",
+    re.DOTALL | re.IGNORECASE,
+)
+_SPACES = re.compile(r"\s+")
+_BETWEEN_TAGS = re.compile(r">\s+<")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON = re.compile(r":\s+")
+_CSS_PROPERTY = re.compile(r"([{;][\w-]+)\s+:")
+_CSS_LAST_SEMICOLON = re.compile(r";}")
+_DATA_URI = re.compile(r"data:[\w/+.-]+(?:;[\w=-]+)*(?:;base64)?,[A-Za-z0-9+/=%._-]+")
+
+# Imagem transparente de 1x1 que substitui data URIs acima do limite
+_EMPTY_IMAGE = "data:image/gif;base64,R0lGODlhAQABAAAAACw="
+
+
+@dataclass
+class SizeReport:
+    original: int
+    final: int
+    style_blocks_removed: int
+    data_uris_removed: int
+    over_budget: bool
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def minify_css(css: str) -> str:
+    """Remove comentários e espaços desnecessários, mantendo as regras"""
+    css = _CSS_COMMENT.sub("", css)
+    css = _SPACES.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    # Antes de ":" só nas declarações; em seletores pode ser um descendente (ex.: "a :hover")
+    css = _CSS_PROPERTY.sub(r"\1:", css)
+    css = _CSS_COLON.sub(":", css)
+    return _CSS_LAST_SEMICOLON.sub("}", css).strip()
+
+
+def _split_rules(css: str) -> List[str]:
+    """Regras de primeiro nível; o último item é a sobra sem chave fechada (CSS truncado)"""
+    rules: List[str] = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:index + 1])
+                start = index + 1
+    rules.append(css[start:])
+    return rules
+
+
+def _dedupe_styles(styles: List[Tuple[str, List[str]]]) -> List[str]:
+    """
+    Descarta regras repetidas na página mantendo a última cópia, que é a que vale na
+    cascata. A chave inclui os atributos do <style> (ex.: media), então blocos com o
+    mesmo texto e media diferente não se misturam.
+    """
+    seen: Set[Tuple[str, str]] = set()
+    bodies: List[str] = []
+    for attrs, rules in reversed(styles):
+        scope = _SPACES.sub(" ", attrs.strip().lower())
+        leftover = rules[-1]
+        kept: List[str] = []
+        for rule in reversed(rules[:-1]):
+            if (scope, rule) in seen:
+                continue
+            seen.add((scope, rule))
+            kept.append(rule)
+        bodies.append("".join(reversed(kept)) + leftover)
+    return bodies[::-1]
+
+
+def _minify_markup(text: str) -> str:
+    text = _BETWEEN_TAGS.sub("> <", text)
+    return _SPACES.sub(" ", text)
+
+
+def _strip_data_uris(text: str, limit: int = DATA_URI_MAX_BYTES) -> Tuple[str, int]:
+    removed = 0
+
+    def replace(match):
+        nonlocal removed
+        if len(match.group()) <= limit or match.group() == _EMPTY_IMAGE:
+            return match.group()
+        removed += 1
+        return _EMPTY_IMAGE
+
+    return _DATA_URI.sub(replace, text), removed
+
+
+def process(html: str, max_bytes: int = SITE_MAX_BYTES) -> Tuple[str, SizeReport]:
+    """Minifica o documento e devolve (html, relatório de tamanhos)"""
+    original = len(html.encode("utf-8"))
+    html, data_uris_removed = _strip_data_uris(html)
+
+    parts: List[str] = []
+    # Blocos de estilo: posição em `parts`, atributos e regras; deduplicados no fim da varredura
+    style_slots: List[int] = []
+    styles: List[Tuple[str, List[str]]] = []
+    style_blocks_removed = 0
+    position = 0
+    for match in _BLOCKS.finditer(html):
+        parts.append(_minify_markup(html[position:match.start()]))
+        position = match.end()
+        tag = (match.group(1) or "").lower()
+        if not tag:
+            # Comentário HTML: descartado
+            continue
+        attrs, body = match.group(2), match.group(3)
+        if tag == "style":
+            style_slots.append(len(parts))
+            styles.append((attrs, _split_rules(minify_css(body))))
+            parts.append("")
+            continue
+        parts.append(f"<{tag}{attrs}>{body}</{tag}>")
+    parts.append(_minify_markup(html[position:]))
+
+    for slot, (attrs, _), body in zip(style_slots, styles, _dedupe_styles(styles)):
+        if body:
+            parts[slot] = f"<style{attrs}>{body}</style>"
+        else:
+            style_blocks_removed += 1
+
+    result = "".join(parts).strip()
+    final = len(result.encode("utf-8"))
+    if final > max_bytes:
+        # Acima do limite: nenhuma data URI fica, qualquer que seja o tamanho
+        result, removed = _strip_data_uris(result, 0)
+        data_uris_removed += removed
+        final = len(result.encode("utf-8"))
+    report = SizeReport(original, final, style_blocks_removed, data_uris_removed, final > max_bytes)
+    if report.over_budget:
+        print(f"⚠️ [POSTPROCESS] Site com {final} bytes acima do limite de {max_bytes}")
+    return result, report
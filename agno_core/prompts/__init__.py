@@ -0,0 +1,129 @@
+"""
+Registro de prompts versionados
+Os templates (`<nome>.v<versão>.txt`, campos no formato de str.format) são lidos uma vez,
+sem a indentação e as linhas em branco repetidas, e a contagem de tokens das partes fixas
+é calculada na carga com uma aproximação local, sem chamar o count_tokens da API.
+"""
+import os
+import re
+import glob
+import string
+import textwrap
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+PROMPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Versão fixada por prompt, ex.: PROMPT_VERSIONS="research=2,website=1"; sem entrada, a mais recente
+PROMPT_VERSIONS = dict(
+    item.split("=", 1) for item in os.getenv("PROMPT_VERSIONS", "").replace(" ", "").split(",") if "=" in item
+)
+
+_FILE_NAME = re.compile(r"^(?P<name>[a-z0-9_]+)\.v(?P<version>\d+)\.txt$")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Aproximação local da contagem de tokens: palavras em pedaços de ~4 letras,
+    números em grupos de 3 dígitos e cada pontuação como um token
+    """
+    total = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece.isdigit():
+            total += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            total += (len(piece) + 3) // 4
+        else:
+            total += 1
+    return total
+
+
+def clean_template(text: str) -> str:
+    """Remove indentação comum, espaços no fim das linhas e linhas em branco repetidas"""
+    text = textwrap.dedent(text)
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: int
+    text: str
+    fields: Tuple[str, ...]
+    static_tokens: int
+
+    @property
+    def key(self) -> str:
+        """Identificador estável do template, usado em chaves de cache"""
+        return f"{self.name}.v{self.version}"
+
+    def render(self, **values) -> str:
+        return self.text.format(**values)
+
+    def estimate(self, **values) -> int:
+        """Tokens estimados do prompt renderizado: parte fixa pré-calculada + valores"""
+        return self.static_tokens + sum(estimate_tokens(str(value)) for value in values.values())
+
+
+def _parse(name: str, version: int, raw: str) -> PromptTemplate:
+    text = clean_template(raw)
+    literal = []
+    fields = []
+    for literal_text, field, _, _ in string.Formatter().parse(text):
+        literal.append(literal_text)
+        if field:
+            fields.append(field)
+    return PromptTemplate(name, version, text, tuple(dict.fromkeys(fields)), estimate_tokens("".join(literal)))
+
+
+class PromptRegistry:
+    def __init__(self, directory: str = PROMPTS_DIR, pinned: Optional[Dict[str, str]] = None):
+        self.directory = directory
+        self.pinned = PROMPT_VERSIONS if pinned is None else pinned
+        self._templates: Optional[Dict[str, Dict[int, PromptTemplate]]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[int, PromptTemplate]]:
+        """Lê todos os templates do diretório uma única vez"""
+        if self._templates is None:
+            with self._lock:
+                if self._templates is None:
+                    templates: Dict[str, Dict[int, PromptTemplate]] = {}
+                    for path in sorted(glob.glob(os.path.join(self.directory, "*.txt"))):
+                        match = _FILE_NAME.match(os.path.basename(path))
+                        if not match:
+                            continue
+                        with open(path, encoding="utf-8") as f:
+                            template = _parse(match["name"], int(match["version"]), f.read())
+                        templates.setdefault(template.name, {})[template.version] = template
+                    self._templates = templates
+                    print(f"📝 [PROMPTS] {sum(len(v) for v in templates.values())} templates carregados")
+        return self._templates
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptTemplate:
+        versions = self.load().get(name)
+        if not versions:
+            raise KeyError(f"Prompt '{name}' não encontrado em {self.directory}")
+        if version is None and name in self.pinned:
+            version = int(self.pinned[name])
+        if version is None:
+            version = max(versions)
+        if version not in versions:
+            raise KeyError(f"Prompt '{name}' não tem a versão {version}")
+        return versions[version]
+
+
+# Registro compartilhado pelo processo
+registry = PromptRegistry()
+
+
+def get_prompt(name: str, version: Optional[int] = None) -> PromptTemplate:
+    return registry.get(name, version)
+
+
+def render(name: str, **values) -> str:
+    return registry.get(name).render(**values)
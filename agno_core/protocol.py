@@ -0,0 +1,61 @@
+"""
+Formato das mensagens trocadas com a interface (WebSocket e /api/chat)
+"""
+import json
+import time
+from typing import Dict, Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Codificações de frame aceitas em /ws?encoding=...
+FRAME_ENCODINGS = ("json", "msgpack")
+
+
+def response_frame(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta o frame de resposta a partir do resultado do SupervisorAgent"""
+    frame = {
+        "type": "response",
+        "content": result["response"],
+        "response_type": result["type"],
+        "timestamp": str(time.time())
+    }
+
+    # Só incluir resultados se houver e não for conversa
+    if result["results"] and result["type"] != "conversation":
+        frame["results"] = result["results"]
+    return frame
+
+
+def dumps(frame: Dict[str, Any]) -> str:
+    """Serializa um frame em JSON (orjson quando disponível)"""
+    if orjson is not None:
+        return orjson.dumps(frame).decode("utf-8")
+    return json.dumps(frame, ensure_ascii=False)
+
+
+def _msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """Codificação pedida pelo cliente, se suportada; JSON caso contrário"""
+    if requested == "msgpack" and _msgpack() is not None:
+        return "msgpack"
+    return "json"
+
+
+def encode_frame(frame: Dict[str, Any], encoding: str = "json") -> Union[str, bytes]:
+    """
+    Codifica o frame para envio. No modo msgpack só os frames com artefatos vão em
+    binário; mensagens de controle continuam em texto JSON.
+    """
+    if encoding == "msgpack" and frame.get("results"):
+        return _msgpack().packb(frame, use_bin_type=True)
+    return dumps(frame)
@@ -0,0 +1,361 @@
+"""
+Política de retry tipada com deadline por requisição, respeito a Retry-After
+e orçamento global de retries
+"""
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from .config import MAX_RETRIES, BASE_DELAY, VERBOSE_LOGS
+
+# Configurações de retry a partir do .env
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "60"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SEC = float(os.getenv("RETRY_BUDGET_MIN_PER_SEC", "0.5"))
+RETRY_BUDGET_WINDOW = float(os.getenv("RETRY_BUDGET_WINDOW", "10"))
+# Espera (s) de uma chave depois de um 429 sem Retry-After
+KEY_COOLDOWN = float(os.getenv("KEY_COOLDOWN", "30"))
+
+
+class ErrorKind(str, Enum):
+    RATE_LIMITED = "rate_limited"
+    TRANSIENT = "transient"
+    FATAL = "fatal"
+
+
+@dataclass
+class ErrorClassification:
+    kind: ErrorKind
+    status: Optional[int] = None
+    retry_after: Optional[float] = None
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind != ErrorKind.FATAL
+
+
+class RequestDeadlineExceeded(TimeoutError):
+    """Deadline da requisição esgotado antes de obter uma resposta"""
+
+
+# Tipos do google.api_core por nome, para não importar a biblioteca só para classificar
+_RATE_LIMITED_TYPES = {"ResourceExhausted", "TooManyRequests"}
+_TRANSIENT_TYPES = {
+    "InternalServerError", "ServiceUnavailable", "BadGateway", "GatewayTimeout",
+    "DeadlineExceeded", "Aborted", "RetryError", "ConnectionError", "ConnectTimeout",
+    "ReadTimeout", "Timeout", "TimeoutError",
+}
+_TRANSIENT_STATUS = {408, 500, 502, 503, 504}
+_GRPC_STATUS = {
+    "RESOURCE_EXHAUSTED": 429,
+    "UNAVAILABLE": 503,
+    "INTERNAL": 500,
+    "DEADLINE_EXCEEDED": 504,
+    "ABORTED": 409,
+    "INVALID_ARGUMENT": 400,
+    "UNAUTHENTICATED": 401,
+    "PERMISSION_DENIED": 403,
+    "NOT_FOUND": 404,
+}
+
+_RATE_LIMITED_TEXT = re.compile(r"\b429\b|RESOURCE_EXHAUSTED|quota exceeded|rate limit", re.IGNORECASE)
+_TRANSIENT_TEXT = re.compile(r"\b50[0234]\b|\bUNAVAILABLE\b|internal error|DEADLINE_EXCEEDED", re.IGNORECASE)
+_RETRY_DELAY_TEXT = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)"),
+    re.compile(r"\"retryDelay\"\s*:\s*\"([\d.]+)s\""),
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "code", None)
+    if callable(code):
+        # grpc.RpcError expõe code() como StatusCode
+        try:
+            code = _GRPC_STATUS.get(getattr(code(), "name", ""))
+        except Exception:
+            code = None
+    if isinstance(code, int):
+        return code
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _parse_retry_after_header(value: str) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Extrai o atraso sugerido pelo servidor (Retry-After ou RetryInfo)"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("Retry-After")
+        except Exception:
+            value = None
+        if value:
+            parsed = _parse_retry_after_header(value)
+            if parsed is not None:
+                return parsed
+
+    for detail in getattr(exc, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+
+    text = str(exc)
+    for pattern in _RETRY_DELAY_TEXT:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def classify_error(exc: BaseException) -> ErrorClassification:
+    """Classifica um erro pelo tipo, código de status e, em último caso, pela mensagem"""
+    if isinstance(exc, RequestDeadlineExceeded):
+        return ErrorClassification(ErrorKind.FATAL)
+
+    status = _status_code(exc)
+    retry_after = _retry_after(exc)
+    names = {cls.__name__ for cls in type(exc).__mro__}
+
+    if names & _RATE_LIMITED_TYPES or status == 429:
+        return ErrorClassification(ErrorKind.RATE_LIMITED, status or 429, retry_after)
+    if names & _TRANSIENT_TYPES or isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return ErrorClassification(ErrorKind.TRANSIENT, status, retry_after)
+    if status is not None:
+        if status in _TRANSIENT_STATUS:
+            return ErrorClassification(ErrorKind.TRANSIENT, status, retry_after)
+        return ErrorClassification(ErrorKind.FATAL, status)
+
+    text = str(exc)
+    if _RATE_LIMITED_TEXT.search(text):
+        return ErrorClassification(ErrorKind.RATE_LIMITED, 429, retry_after)
+    if _TRANSIENT_TEXT.search(text):
+        return ErrorClassification(ErrorKind.TRANSIENT, None, retry_after)
+    return ErrorClassification(ErrorKind.FATAL)
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "agno_request_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None):
+    """
+    Define o deadline da requisição atual; chamadas aninhadas só podem encurtá-lo.
+    Propaga para tarefas asyncio e threads de asyncio.to_thread via contextvars.
+    """
+    deadline = Deadline(REQUEST_DEADLINE if seconds is None else seconds)
+    parent = _current_deadline.get()
+    if parent is not None and parent.expires_at < deadline.expires_at:
+        deadline = parent
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+class RetryBudget:
+    """
+    Orçamento de retries do processo: cada requisição deposita `ratio` retries
+    e há um mínimo de `min_per_sec` retries por segundo dentro da janela.
+    Evita que retries multipliquem a carga durante uma instabilidade da API.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_sec: float = RETRY_BUDGET_MIN_PER_SEC,
+                 window: float = RETRY_BUDGET_WINDOW):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        limit = now - self.window
+        while self._requests and self._requests[0] < limit:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < limit:
+            self._retries.popleft()
+
+    def _allowance(self) -> float:
+        return self.min_per_sec * self.window + self.ratio * len(self._requests)
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._retries) + 1 > self._allowance():
+                return False
+            self._retries.append(now)
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "allowance": round(self._allowance(), 2),
+            }
+
+
+# Orçamento global compartilhado por todos os agentes do processo
+retry_budget = RetryBudget()
+
+
+class KeyCooldowns:
+    """Chaves de API que receberam 429 e até quando ficam em espera"""
+
+    def __init__(self):
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, api_key: str, seconds: float):
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._until[api_key] = max(until, self._until.get(api_key, 0.0))
+
+    def remaining(self, api_key: str) -> float:
+        with self._lock:
+            until = self._until.get(api_key)
+            if until is None:
+                return 0.0
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                del self._until[api_key]
+                return 0.0
+            return remaining
+
+
+# Estado de throttle por chave, consultado pela readiness
+key_cooldowns = KeyCooldowns()
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = MAX_RETRIES
+    base_delay: float = BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    budget: RetryBudget = retry_budget
+    # Chave usada nas chamadas; um 429 a coloca em espera em key_cooldowns
+    api_key: Optional[str] = None
+
+    def compute_delay(self, attempt: int, classification: ErrorClassification) -> float:
+        if classification.retry_after is not None:
+            return min(classification.retry_after, self.max_delay) + random.uniform(0, 0.5)
+        base = self.base_delay * (2 if classification.kind == ErrorKind.RATE_LIMITED else 1)
+        return min(base * (2 ** attempt), self.max_delay) + random.uniform(0, 1)
+
+    async def call(self, func, *args, **kwargs) -> Any:
+        """Executa `func` (síncrona em thread ou corrotina) aplicando a política"""
+        deadline = current_deadline()
+        self.budget.record_request()
+
+        attempt = 0
+        while True:
+            if deadline is not None and deadline.expired:
+                raise RequestDeadlineExceeded("Deadline da requisição esgotado")
+
+            if VERBOSE_LOGS:
+                print(f"🔄 [RETRY] Tentativa {attempt + 1}/{self.max_attempts}")
+            if asyncio.iscoroutinefunction(func):
+                pending = func(*args, **kwargs)
+            else:
+                pending = asyncio.to_thread(func, *args, **kwargs)
+
+            try:
+                if deadline is not None:
+                    return await asyncio.wait_for(pending, deadline.remaining())
+                return await pending
+            except Exception as e:
+                if deadline is not None and deadline.expired:
+                    print(f"⌛ [RETRY] Deadline esgotado na tentativa {attempt + 1}")
+                    raise RequestDeadlineExceeded("Deadline da requisição esgotado") from e
+
+                classification = classify_error(e)
+                print(f"❌ [RETRY] Erro na tentativa {attempt + 1} ({classification.kind.value}, "
+                      f"status={classification.status}): {str(e)}")
+                if classification.kind == ErrorKind.RATE_LIMITED and self.api_key:
+                    key_cooldowns.record(self.api_key, classification.retry_after or KEY_COOLDOWN)
+
+                if not classification.retryable:
+                    print("🚫 [RETRY] Erro não recuperável, não tentando novamente")
+                    raise
+                if attempt + 1 >= self.max_attempts:
+                    print("💥 [RETRY] Todas as tentativas falharam")
+                    raise
+
+                delay = self.compute_delay(attempt, classification)
+                if deadline is not None and delay >= deadline.remaining():
+                    print(f"⌛ [RETRY] Atraso de {delay:.2f}s ultrapassa o deadline, desistindo")
+                    raise
+                if not self.budget.try_spend():
+                    print("🪫 [RETRY] Orçamento de retries esgotado, desistindo")
+                    raise
+
+                print(f"⏳ [RETRY] Aguardando {delay:.2f}s antes da próxima tentativa...")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+async def retry_with_backoff(func, *args, max_retries=None, base_delay=None, api_key=None, **kwargs):
+    """
+    Executa uma função com a política de retry padrão.
+    `max_retries` é o número máximo de tentativas e `base_delay` o atraso base do backoff;
+    `api_key` é a chave da chamada, para registrar a espera dela quando vier um 429.
+    """
+    policy = RetryPolicy(
+        max_attempts=MAX_RETRIES if max_retries is None else max_retries,
+        base_delay=BASE_DELAY if base_delay is None else base_delay,
+        api_key=api_key,
+    )
+    return await policy.call(func, *args, **kwargs)
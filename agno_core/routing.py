@@ -0,0 +1,57 @@
+"""
+Roteador léxico do supervisor
+Resolve localmente as mensagens cuja intenção é óbvia (pedido de site, pedido de
+pesquisa, saudação, alteração do site aberto), poupando a chamada de decisão ao modelo.
+"""
+import re
+from typing import Dict, Any, Optional
+
+_WEBSITE = re.compile(
+    r"\b(cri[ea]r?|fa[çz]a|fazer|ger[ea]r?|montar?|monte|desenvolv[ae]r?|construa|construir)\b"
+    r".{0,60}\b(site|website|p[áa]gina|landing ?page|html)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+_RESEARCH = re.compile(
+    r"^\s*(pesquis[ea]r?|busque|buscar|procure|procurar)\b",
+    re.IGNORECASE,
+)
+_EDIT = re.compile(
+    r"^\s*(mude|mudar|altere|alterar|troque|trocar|aumente|diminua|remova|remover|tire|adicione|"
+    r"acrescente|coloque|deixe|corrija|substitua|edite|ajuste)\b",
+    re.IGNORECASE,
+)
+# Objeto da alteração: o site ou uma parte dele. Sem ele ("adicione uma pesquisa sobre X"),
+# a decisão fica com o modelo
+_EDIT_TARGET = re.compile(
+    r"\b(site|website|p[áa]gina|header|cabe[çc]alho|menu|nav|navega[çc][ãa]o|rodap[ée]|footer|"
+    r"se[çc][ãa]o|se[çc][õo]es|t[íi]tulos?|subt[íi]tulos?|cor|cores|fontes?|bot[ãa]o|bot[õo]es|"
+    r"imagens?|fotos?|fundo|background|layout|logo|banner|hero|formul[áa]rio|links?|estilos?|css|"
+    r"tema|textos?|par[áa]grafos?|galeria|cards?|[íi]cones?|margens?|espa[çc]amento|tamanho)\b",
+    re.IGNORECASE,
+)
+_GREETING = re.compile(
+    r"^\s*(ol[áa]|oi|e a[íi]|bom dia|boa tarde|boa noite|tudo bem|obrigad[oa]|valeu)[\s!.,?]*$",
+    re.IGNORECASE,
+)
+
+
+def route(message: str) -> Optional[Dict[str, Any]]:
+    """Decisão no formato do supervisor, ou None quando a intenção não é óbvia"""
+    if _GREETING.match(message):
+        return {"needs_tool": False, "tool_type": "none", "description": message, "is_greeting": True}
+    if _WEBSITE.search(message):
+        return {"needs_tool": True, "tool_type": "website", "description": message, "is_greeting": False}
+    if _RESEARCH.match(message):
+        return {"needs_tool": True, "tool_type": "research", "description": message, "is_greeting": False}
+    return None
+
+
+def is_edit_request(message: str) -> bool:
+    """Mensagem que pede alteração do site ou de uma parte dele ("mude a cor do header")"""
+    match = _EDIT.match(message)
+    return bool(match) and bool(_EDIT_TARGET.search(message, match.end()))
+
+
+def edit_decision(message: str, artifact_id: str) -> Dict[str, Any]:
+    return {"needs_tool": True, "tool_type": "edit", "description": message,
+            "artifact_id": artifact_id, "is_greeting": False}
@@ -0,0 +1,145 @@
+"""
+Escalonador de níveis de modelo (base/medio/avancado) por chamada
+Pondera a complexidade estimada do prompt, a folga de rate limit de cada nível
+e a latência observada; sob pressão, rebaixa para um nível mais barato em vez de enfileirar.
+"""
+import os
+import re
+import time
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from .config import VERBOSE_LOGS
+from .state import get_state
+
+TIERS = ("base", "medio", "avancado")
+
+RATE_LIMITS = {
+    "base": int(os.getenv("RATE_LIMIT_BASE", "60")),
+    "medio": int(os.getenv("RATE_LIMIT_MEDIO", "30")),
+    "avancado": int(os.getenv("RATE_LIMIT_AVANCADO", "10")),
+}
+TIER_COMPLEXITY_MEDIO = float(os.getenv("TIER_COMPLEXITY_MEDIO", "0.35"))
+TIER_COMPLEXITY_AVANCADO = float(os.getenv("TIER_COMPLEXITY_AVANCADO", "0.7"))
+TIER_MIN_HEADROOM = float(os.getenv("TIER_MIN_HEADROOM", "0.1"))
+TIER_LATENCY_SLO = float(os.getenv("TIER_LATENCY_SLO", "30"))
+
+# Nível máximo que cada tipo de chamada pode usar
+AGENT_CEILING = {
+    "research": "avancado",
+    "coder": "avancado",
+    "supervisor": "medio",
+    "chat": "medio",
+}
+
+_COMPLEX_TERMS = re.compile(
+    r"arquitetura|complet[oa]|complex[oa]|detalhad[oa]|escal[áa]vel|microservi[çc]os|e-?commerce|"
+    r"marketplace|pagamento|dashboard|autentica[çc][ãa]o|banco de dados|an[áa]lise|compar[ae]|"
+    r"profund[oa]|estrat[ée]gia|otimiz|algoritmo|multi-?p[áa]gina",
+    re.IGNORECASE,
+)
+_SIMPLE_TERMS = re.compile(
+    r"\b(simples|b[áa]sic[oa]|r[áa]pid[oa]|resumo|curto|ol[áa]|oi|bom dia|boa tarde|boa noite|obrigad[oa]|"
+    r"o que [ée])\b",
+    re.IGNORECASE,
+)
+
+
+def estimate_complexity(text: str) -> float:
+    """Estimativa barata (0..1) da complexidade de um prompt"""
+    words = len(text.split())
+    score = min(words / 120, 0.5)
+    score += 0.15 * len(_COMPLEX_TERMS.findall(text))
+    score -= 0.15 * len(_SIMPLE_TERMS.findall(text))
+    return max(0.0, min(1.0, score))
+
+
+class TierScheduler:
+    def __init__(self, rate_limits: Dict[str, int] = RATE_LIMITS):
+        # Os baldes ficam no backend de estado, compartilhados entre workers quando for Redis
+        self.rate_limits = dict(rate_limits)
+        self.latency: Dict[str, Optional[float]] = {tier: None for tier in TIERS}
+        self._lock = threading.Lock()
+
+    def _desired_tier(self, kind: str, text: str, preferred: str) -> int:
+        complexity = estimate_complexity(text)
+        if complexity >= TIER_COMPLEXITY_AVANCADO:
+            wanted = 2
+        elif complexity >= TIER_COMPLEXITY_MEDIO:
+            wanted = 1
+        else:
+            wanted = 0
+        ceiling = TIERS.index(AGENT_CEILING.get(kind, "avancado"))
+        return min(max(wanted, TIERS.index(preferred)), ceiling)
+
+    async def _take(self, tier: str, min_headroom: float = 0.0) -> bool:
+        return await get_state().take_token(f"tier:{tier}", self.rate_limits[tier], min_headroom)
+
+    async def select(self, kind: str, text: str, preferred: str = "base") -> str:
+        """Escolhe o nível para a chamada e reserva um token do rate limit"""
+        desired = self._desired_tier(kind, text, preferred)
+        index = desired
+        latency = self.latency[TIERS[index]]
+        if index > 0 and latency is not None and latency > TIER_LATENCY_SLO:
+            index -= 1
+
+        # Do nível desejado para baixo: o primeiro com folga vence
+        for candidate in range(index, -1, -1):
+            if await self._take(TIERS[candidate], TIER_MIN_HEADROOM):
+                return self._chosen(kind, desired, candidate)
+
+        # Sem folga: qualquer nível permitido com token, do mais barato ao mais caro
+        ceiling = TIERS.index(AGENT_CEILING.get(kind, "avancado"))
+        for candidate in range(ceiling + 1):
+            if await self._take(TIERS[candidate]):
+                return self._chosen(kind, desired, candidate)
+
+        # Todos esgotados: segue no nível desejado e deixa a política de retry lidar com o 429
+        return self._chosen(kind, desired, desired)
+
+    async def reserve(self, tier: str) -> bool:
+        """Reserva um token de um nível já escolhido (ex.: a duplicata de um hedge)"""
+        return await self._take(tier)
+
+    def _chosen(self, kind: str, desired: int, index: int) -> str:
+        tier = TIERS[index]
+        if VERBOSE_LOGS and index != desired:
+            print(f"⚖️ [SCHEDULER] {kind}: nível {TIERS[desired]} sob pressão, usando {tier}")
+        return tier
+
+    def record(self, tier: str, seconds: float):
+        with self._lock:
+            previous = self.latency[tier]
+            self.latency[tier] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+
+    @asynccontextmanager
+    async def observe(self, tier: str):
+        """Mede a latência das chamadas bem-sucedidas ao nível escolhido"""
+        started = time.monotonic()
+        yield
+        self.record(tier, time.monotonic() - started)
+
+    async def capacity(self, kind: str = "supervisor") -> float:
+        """Segundos até algum nível permitido para `kind` ter um token (0 se já houver)"""
+        state = get_state()
+        ceiling = TIERS.index(AGENT_CEILING.get(kind, "avancado"))
+        waits = [
+            await state.wait_time(f"tier:{tier}", self.rate_limits[tier])
+            for tier in TIERS[:ceiling + 1]
+        ]
+        return min(waits)
+
+    async def snapshot(self) -> dict:
+        state = get_state()
+        return {
+            tier: {
+                "headroom": round(await state.headroom(f"tier:{tier}", self.rate_limits[tier]), 3),
+                "latency": None if self.latency[tier] is None else round(self.latency[tier], 3),
+            }
+            for tier in TIERS
+        }
+
+
+# Escalonador compartilhado pelo processo
+tier_scheduler = TierScheduler()
@@ -0,0 +1,180 @@
+"""
+Geração de sites por seções em paralelo
+Um plano curto define as seções e os design tokens (variáveis CSS); cada seção é
+gerada separadamente, todas ao mesmo tempo, e a página é montada e validada no fim.
+"""
+import os
+import re
+import json
+import html
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .prompts import get_prompt
+from .markup import TagBalancer
+
+CODER_MODE = os.getenv("CODER_MODE", "auto").lower()
+CODER_SECTIONS_MIN_COMPLEXITY = float(os.getenv("CODER_SECTIONS_MIN_COMPLEXITY", "0.5"))
+CODER_MAX_SECTIONS = int(os.getenv("CODER_MAX_SECTIONS", "6"))
+
+_PLAN_JSON = re.compile(r"\{.*\}", re.DOTALL)
+_FRAGMENT_FENCE = re.compile(r"```(?:html)?\s*\n(.*?)\n```", re.DOTALL)
+_SECTION_ID = re.compile(r"[^a-z0-9-]+")
+_TOKEN_NAME = re.compile(r"^--[a-z0-9-]+$")
+_TOKEN_VALUE = re.compile(r"^[^;{}<>]+$")
+
+DEFAULT_TOKENS = {
+    "--color-primary": "#4f46e5",
+    "--color-secondary": "#7c3aed",
+    "--color-text": "#1f2937",
+    "--color-background": "#ffffff",
+    "--color-muted": "#f3f4f6",
+    "--font-family": "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif",
+    "--radius": "12px",
+    "--spacing": "1.5rem",
+    "--max-width": "1100px",
+}
+
+
+@dataclass
+class SectionPlan:
+    id: str
+    tag: str
+    description: str
+
+
+@dataclass
+class SitePlan:
+    title: str
+    tokens: Dict[str, str]
+    sections: List[SectionPlan]
+
+
+def use_sections(complexity: float) -> bool:
+    """Se o site deve ser gerado por seções conforme CODER_MODE"""
+    if CODER_MODE == "sections":
+        return True
+    if CODER_MODE == "single":
+        return False
+    return complexity >= CODER_SECTIONS_MIN_COMPLEXITY
+
+
+def default_plan(description: str) -> SitePlan:
+    return SitePlan(
+        title=description[:80],
+        tokens=dict(DEFAULT_TOKENS),
+        sections=[
+            SectionPlan("header", "header", f"Cabeçalho com logo e menu de navegação para: {description}"),
+            SectionPlan("hero", "section", f"Seção de destaque com título, subtítulo e chamada para ação sobre: {description}"),
+            SectionPlan("conteudo", "section", f"Conteúdo principal em cards com informações reais sobre: {description}"),
+            SectionPlan("footer", "footer", f"Rodapé com contato, links e copyright para: {description}"),
+        ],
+    )
+
+
+def plan_prompt(description: str) -> str:
+    return get_prompt("site_plan").render(description=description, max_sections=CODER_MAX_SECTIONS)
+
+
+def parse_plan(text: str, description: str) -> SitePlan:
+    """Plano devolvido pelo modelo, validado; o plano padrão cobre o que faltar"""
+    plan = default_plan(description)
+    match = _PLAN_JSON.search(text or "")
+    if not match:
+        return plan
+    try:
+        data = json.loads(match.group())
+    except ValueError:
+        return plan
+
+    tokens = data.get("tokens") or {}
+    if isinstance(tokens, dict):
+        for name, value in tokens.items():
+            if _TOKEN_NAME.match(str(name)) and _TOKEN_VALUE.match(str(value)):
+                plan.tokens[str(name)] = str(value)
+
+    sections = []
+    seen = set()
+    for item in data.get("sections") or []:
+        if not isinstance(item, dict) or not item.get("description"):
+            continue
+        section_id = _SECTION_ID.sub("-", str(item.get("id", "")).lower()).strip("-") or f"secao-{len(sections) + 1}"
+        if section_id in seen:
+            section_id = f"{section_id}-{len(sections) + 1}"
+        seen.add(section_id)
+        tag = str(item.get("tag", "section")).lower()
+        if tag not in ("header", "section", "footer", "nav"):
+            tag = "section"
+        sections.append(SectionPlan(section_id, tag, str(item["description"])))
+    if len(sections) >= 2:
+        plan.sections = sections[:CODER_MAX_SECTIONS]
+    if data.get("title"):
+        plan.title = str(data["title"])[:120]
+    return plan
+
+
+def tokens_css(tokens: Dict[str, str]) -> str:
+    return ":root {\n" + "".join(f"    {name}: {value};\n" for name, value in tokens.items()) + "}"
+
+
+def section_prompt(plan: SitePlan, section: SectionPlan) -> str:
+    others = ", ".join(item.id for item in plan.sections if item.id != section.id)
+    return get_prompt("site_section").render(
+        title=plan.title, tag=section.tag, id=section.id, description=section.description,
+        others=others, tokens=tokens_css(plan.tokens),
+    )
+
+
+def extract_fragment(text: str) -> str:
+    """O elemento da seção dentro da resposta do modelo (com ou sem bloco ```html)"""
+    match = _FRAGMENT_FENCE.search(text or "")
+    fragment = match.group(1) if match else (text or "")
+    start = fragment.find("<")
+    end = fragment.rfind(">")
+    return fragment[start:end + 1].strip() if start != -1 and end > start else ""
+
+
+def validate_fragment(fragment: str, section: SectionPlan) -> Optional[str]:
+    """Fragmento com as tags fechadas, ou None se não servir para a seção"""
+    if not fragment or re.search(r"<(html|head|body)\b", fragment, re.IGNORECASE):
+        return None
+    balancer = TagBalancer()
+    balancer.feed(fragment)
+    balancer.close()
+    if balancer.stray > 2:
+        return None
+    fragment += "".join(f"</{tag}>" for tag in reversed(balancer.stack))
+    if not re.match(rf"<{section.tag}\b", fragment, re.IGNORECASE):
+        fragment = f'<{section.tag} id="{section.id}">{fragment}</{section.tag}>'
+    return fragment
+
+
+def placeholder_section(section: SectionPlan) -> str:
+    """Seção simples usada quando a geração falha ou não passa na validação"""
+    return (
+        f'<{section.tag} id="{section.id}" class="placeholder">'
+        f"<p>{html.escape(section.description)}</p></{section.tag}>"
+    )
+
+
+def assemble(plan: SitePlan, fragments: List[str]) -> str:
+    body = "\n".join(fragments)
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(plan.title)}</title>
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+    <style>
+{tokens_css(plan.tokens)}
+* {{ margin: 0; padding: 0; box-sizing: border-box; }}
+body {{ font-family: var(--font-family); color: var(--color-text); background: var(--color-background); line-height: 1.6; }}
+body > * {{ padding: var(--spacing); }}
+.placeholder {{ max-width: var(--max-width); margin: 0 auto; }}
+    </style>
+</head>
+<body>
+{body}
+</body>
+</html>"""
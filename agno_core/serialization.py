@@ -0,0 +1,97 @@
+"""
+Serialização das respostas fora do event loop quando o payload é grande
+O tamanho é estimado sem codificar; acima do limite, a codificação vai para uma
+thread e o resultado é entregue em pedaços (HTTP em streaming, WebSocket em envelopes).
+"""
+import os
+import json
+import uuid
+import asyncio
+from typing import Any, AsyncIterator, List, Union
+
+from .protocol import orjson, encode_frame
+
+SERIALIZE_OFFLOAD_BYTES = int(os.getenv("SERIALIZE_OFFLOAD_BYTES", "65536"))
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", "65536"))
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimativa rápida do tamanho serializado, sem gerar o JSON"""
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2
+            for key, value in item.items():
+                size += len(key) + 4
+                stack.append(value)
+        elif isinstance(item, (list, tuple)):
+            size += 2 + len(item)
+            stack.extend(item)
+        elif isinstance(item, (bytes, bytearray)):
+            size += len(item)
+        else:
+            size += 8
+    return size
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+async def encode_json(obj: Any) -> bytes:
+    """Codifica em JSON; payloads grandes são codificados em uma thread"""
+    if estimate_size(obj) < SERIALIZE_OFFLOAD_BYTES:
+        return dumps_bytes(obj)
+    return await asyncio.to_thread(dumps_bytes, obj)
+
+
+async def iter_chunks(data: bytes, size: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Entrega os bytes em pedaços, cedendo o loop entre eles"""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+        await asyncio.sleep(0)
+
+
+async def json_response(content: Any, status_code: int = 200):
+    """Resposta JSON com codificação fora do loop e streaming para corpos grandes"""
+    from fastapi.responses import Response, StreamingResponse
+
+    body = await encode_json(content)
+    if len(body) <= STREAM_CHUNK_BYTES:
+        return Response(content=body, status_code=status_code, media_type="application/json")
+    return StreamingResponse(iter_chunks(body), status_code=status_code, media_type="application/json")
+
+
+def _ws_messages(frame: dict, encoding: str) -> List[Union[str, bytes]]:
+    encoded = encode_frame(frame, encoding)
+    if isinstance(encoded, bytes) or len(encoded) <= STREAM_CHUNK_BYTES:
+        return [encoded]
+
+    frame_id = uuid.uuid4().hex
+    total = (len(encoded) + STREAM_CHUNK_BYTES - 1) // STREAM_CHUNK_BYTES
+    return [
+        dumps_bytes({
+            "type": "chunk",
+            "id": frame_id,
+            "seq": seq,
+            "total": total,
+            "data": encoded[seq * STREAM_CHUNK_BYTES:(seq + 1) * STREAM_CHUNK_BYTES],
+        }).decode("utf-8")
+        for seq in range(total)
+    ]
+
+
+async def encode_ws_frames(frame: dict, encoding: str = "json") -> List[Union[str, bytes]]:
+    """
+    Mensagens do WebSocket para um frame. Frames JSON grandes viram envelopes
+    {"type": "chunk", "id", "seq", "total", "data"} que o cliente remonta.
+    """
+    if estimate_size(frame) < SERIALIZE_OFFLOAD_BYTES:
+        return [encode_frame(frame, encoding)]
+    return await asyncio.to_thread(_ws_messages, frame, encoding)
@@ -0,0 +1,288 @@
+"""
+Estado compartilhado entre workers: registro de conexões, pub/sub de broadcast,
+baldes de rate limit e cache de respostas
+O backend padrão fica no próprio processo; com STATE_BACKEND=redis o estado vai para um
+Redis (pacote opcional `redis`), permitindo `uvicorn --workers N` e vários nós.
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Set
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+STATE_PREFIX = os.getenv("STATE_PREFIX", "agno")
+CONNECTION_TTL = float(os.getenv("CONNECTION_TTL", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+# Identifica este worker no registro de conexões
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class TokenBucket:
+    """Balde de tokens com reposição contínua a partir de um limite por minuto"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(per_minute, 1))
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def headroom(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens / self.capacity
+
+    def wait_time(self) -> float:
+        with self._lock:
+            self._refill()
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def try_take(self, cost: float = 1.0, min_headroom: float = 0.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens < cost or self.tokens / self.capacity < min_headroom:
+                return False
+            self.tokens -= cost
+            return True
+
+
+class StateBackend(ABC):
+    """Interface comum dos backends de estado; um backend incompleto falha ao ser criado"""
+
+    @abstractmethod
+    async def register_connection(self, conn_id: str, info: Optional[dict] = None):
+        ...
+
+    @abstractmethod
+    async def unregister_connection(self, conn_id: str):
+        ...
+
+    async def heartbeat(self, conn_ids):
+        """Renova as conexões deste worker no registro"""
+
+    @abstractmethod
+    async def connection_count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[str]:
+        ...
+
+    @abstractmethod
+    async def take_token(self, key: str, per_minute: int, min_headroom: float = 0.0) -> bool:
+        ...
+
+    @abstractmethod
+    async def headroom(self, key: str, per_minute: int) -> float:
+        ...
+
+    @abstractmethod
+    async def wait_time(self, key: str, per_minute: int) -> float:
+        """Segundos até haver um token disponível no balde"""
+
+    @abstractmethod
+    async def cache_get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def cache_set(self, key: str, value: str, ttl: float):
+        ...
+
+    async def close(self):
+        """Libera conexões do backend"""
+
+
+class InMemoryBackend(StateBackend):
+    """Estado no próprio processo (um único worker)"""
+
+    name = "memory"
+
+    def __init__(self, cache_max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.connections: Dict[str, dict] = {}
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.cache_max_entries = cache_max_entries
+        self._lock = threading.Lock()
+
+    async def register_connection(self, conn_id: str, info: Optional[dict] = None):
+        self.connections[conn_id] = info or {}
+
+    async def unregister_connection(self, conn_id: str):
+        self.connections.pop(conn_id, None)
+
+    async def connection_count(self) -> int:
+        return len(self.connections)
+
+    async def publish(self, channel: str, message: str):
+        for queue in list(self.subscribers.get(channel, ())):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers[channel].discard(queue)
+
+    def _bucket(self, key: str, per_minute: int) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self.buckets.setdefault(key, TokenBucket(per_minute))
+        return bucket
+
+    async def take_token(self, key: str, per_minute: int, min_headroom: float = 0.0) -> bool:
+        return self._bucket(key, per_minute).try_take(min_headroom=min_headroom)
+
+    async def headroom(self, key: str, per_minute: int) -> float:
+        return self._bucket(key, per_minute).headroom()
+
+    async def wait_time(self, key: str, per_minute: int) -> float:
+        return self._bucket(key, per_minute).wait_time()
+
+    async def cache_get(self, key: str) -> Optional[str]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            self.cache.pop(key, None)
+            return None
+        self.cache.move_to_end(key)
+        return value
+
+    async def cache_set(self, key: str, value: str, ttl: float):
+        self.cache[key] = (value, time.monotonic() + ttl)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_max_entries:
+            self.cache.popitem(last=False)
+
+
+class RedisBackend(StateBackend):
+    """
+    Estado em um Redis compartilhado por todos os workers.
+    Conexões ficam em um sorted set com o horário da última renovação; o rate limit
+    usa janelas fixas de um minuto com INCR, atômico sem scripts Lua.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = STATE_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    async def register_connection(self, conn_id: str, info: Optional[dict] = None):
+        await self.client.zadd(self._key("connections"), {conn_id: time.time()})
+        if info:
+            await self.client.set(self._key("connection", conn_id), json.dumps(info), ex=int(CONNECTION_TTL * 2))
+
+    async def unregister_connection(self, conn_id: str):
+        await self.client.zrem(self._key("connections"), conn_id)
+
+    async def heartbeat(self, conn_ids):
+        conn_ids = list(conn_ids)
+        if conn_ids:
+            now = time.time()
+            await self.client.zadd(self._key("connections"), {conn_id: now for conn_id in conn_ids})
+
+    async def connection_count(self) -> int:
+        # Conexões de workers que pararam de renovar expiram pelo TTL
+        key = self._key("connections")
+        await self.client.zremrangebyscore(key, "-inf", time.time() - CONNECTION_TTL)
+        return await self.client.zcard(key)
+
+    async def publish(self, channel: str, message: str):
+        await self.client.publish(self._key("channel", channel), message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self._key("channel", channel))
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") != "message":
+                    continue
+                data = item["data"]
+                yield data.decode("utf-8") if isinstance(data, bytes) else data
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+
+    def _window_key(self, key: str) -> str:
+        return self._key("ratelimit", key, str(int(time.time() // 60)))
+
+    async def take_token(self, key: str, per_minute: int, min_headroom: float = 0.0) -> bool:
+        window_key = self._window_key(key)
+        count = await self.client.incr(window_key)
+        if count == 1:
+            await self.client.expire(window_key, 120)
+        limit = max(per_minute, 1)
+        if count > limit or 1 - (count - 1) / limit < min_headroom:
+            await self.client.decr(window_key)
+            return False
+        return True
+
+    async def headroom(self, key: str, per_minute: int) -> float:
+        used = int(await self.client.get(self._window_key(key)) or 0)
+        return max(0.0, 1 - used / max(per_minute, 1))
+
+    async def wait_time(self, key: str, per_minute: int) -> float:
+        used = int(await self.client.get(self._window_key(key)) or 0)
+        return 0.0 if used < max(per_minute, 1) else 60 - time.time() % 60
+
+    async def cache_get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self._key("cache", key))
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    async def cache_set(self, key: str, value: str, ttl: float):
+        await self.client.set(self._key("cache", key), value, ex=max(1, int(ttl)))
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close")
+        await close()
+
+
+def _create_backend() -> StateBackend:
+    if STATE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            print("⚠️ [STATE] Pacote 'redis' não instalado, usando estado em memória")
+            return InMemoryBackend()
+        print(f"🗄️ [STATE] Estado compartilhado no Redis ({REDIS_URL})")
+        return RedisBackend(redis.from_url(REDIS_URL))
+    return InMemoryBackend()
+
+
+_state: Optional[StateBackend] = None
+
+
+def get_state() -> StateBackend:
+    """Backend de estado do processo, criado no primeiro uso"""
+    global _state
+    if _state is None:
+        _state = _create_backend()
+    return _state
@@ -0,0 +1,187 @@
+"""
+Miniaturas dos sites gerados, sem navegador headless
+O HTML é lido uma vez para extrair título, cores e a sequência de blocos da página
+(header, seções, footer) e vira um SVG pequeno em formato de wireframe. Como o artefato
+é imutável, a miniatura é gravada ao lado dele e servida do disco nas próximas vezes.
+"""
+import os
+import re
+import html
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "320"))
+THUMBNAIL_HEIGHT = int(os.getenv("THUMBNAIL_HEIGHT", "200"))
+# Entra no nome do arquivo em cache; mudar o desenho exige subir a versão
+THUMBNAIL_VERSION = 1
+THUMBNAIL_MAX_BLOCKS = 6
+
+_BLOCK_TAGS = {"header", "nav", "section", "main", "article", "footer"}
+_HEADING_TAGS = {"h1", "h2", "h3"}
+_COLOR = re.compile(r"^(#[0-9a-fA-F]{3,8}|(rgb|hsl)a?\([\d\s.,%]+\)|[a-zA-Z]{3,20})$")
+_HEX_COLOR = re.compile(r"#[0-9a-fA-F]{3,8}\b")
+_CSS_VARIABLE = re.compile(r"(--[\w-]+)\s*:\s*([^;}]+)")
+_CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_BACKGROUND = re.compile(r"background(?:-color)?\s*:\s*([^;}]+)")
+_TEXT_COLOR = re.compile(r"(?<![-\w])color\s*:\s*([^;}]+)")
+
+DEFAULT_COLORS = {
+    "background": "#ffffff",
+    "primary": "#4f46e5",
+    "text": "#1f2937",
+    "muted": "#f3f4f6",
+}
+
+
+@dataclass
+class Block:
+    tag: str
+    heading: str = ""
+
+
+@dataclass
+class SiteSnapshot:
+    title: str = ""
+    colors: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_COLORS))
+    blocks: List[Block] = field(default_factory=list)
+
+
+class _SnapshotParser(HTMLParser):
+    """Título, CSS e os blocos de primeiro nível do body, cada um com seu primeiro título"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.css: List[str] = []
+        self.blocks: List[Block] = []
+        self._in_title = False
+        self._in_style = False
+        self._block_depth = 0
+        self._heading: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag == "style":
+            self._in_style = True
+        elif tag in _BLOCK_TAGS:
+            if self._block_depth == 0:
+                self.blocks.append(Block(tag))
+            self._block_depth += 1
+        elif tag in _HEADING_TAGS and self.blocks and not self.blocks[-1].heading:
+            self._heading = []
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "style":
+            self._in_style = False
+        elif tag in _BLOCK_TAGS and self._block_depth:
+            self._block_depth -= 1
+        elif tag in _HEADING_TAGS and self._heading is not None:
+            self.blocks[-1].heading = " ".join("".join(self._heading).split())
+            self._heading = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._in_style:
+            self.css.append(data)
+        elif self._heading is not None:
+            self._heading.append(data)
+
+
+def _color(value: str) -> Optional[str]:
+    """Cor aceita no SVG; de um gradiente, fica a primeira cor hexadecimal"""
+    value = value.strip()
+    first = value.split()[0] if value else ""
+    if _COLOR.match(first):
+        return first
+    match = _HEX_COLOR.search(value)
+    return match.group() if match else None
+
+
+def _colors(css: str) -> Dict[str, str]:
+    """Cores da página: design tokens (--color-*) primeiro, depois as regras de body e header"""
+    colors = dict(DEFAULT_COLORS)
+    variables = {name: value.strip() for name, value in _CSS_VARIABLE.findall(css)}
+    for role in colors:
+        value = _color(variables.get(f"--color-{role}", ""))
+        if value:
+            colors[role] = value
+    for selector, body in _CSS_RULE.findall(css):
+        selector = selector.strip().lower()
+        background = _BACKGROUND.search(body)
+        if selector == "body":
+            value = _color(background.group(1)) if background else None
+            if value and "--color-background" not in variables:
+                colors["background"] = value
+            text = _TEXT_COLOR.search(body)
+            value = _color(text.group(1)) if text else None
+            if value and "--color-text" not in variables:
+                colors["text"] = value
+        elif selector in ("header", "nav", ".header", ".navbar") and background:
+            value = _color(background.group(1))
+            if value and "--color-primary" not in variables:
+                colors["primary"] = value
+    return colors
+
+
+def snapshot(document: str) -> SiteSnapshot:
+    parser = _SnapshotParser()
+    parser.feed(document)
+    parser.close()
+    title = " ".join(parser.title.split())
+    blocks = parser.blocks[:THUMBNAIL_MAX_BLOCKS] or [Block("section", title)]
+    return SiteSnapshot(title, _colors("\n".join(parser.css)), blocks)
+
+
+def _text(x: int, y: int, size: int, color: str, text: str, limit: int) -> str:
+    text = text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+    return (
+        f'<text x="{x}" y="{y}" font-size="{size}" fill="{html.escape(color)}" '
+        f'font-family="sans-serif">{html.escape(text)}</text>'
+    )
+
+
+def render_svg(site: SiteSnapshot, width: int = THUMBNAIL_WIDTH, height: int = THUMBNAIL_HEIGHT) -> str:
+    """Wireframe da página: uma faixa por bloco, com o título de cada um e linhas de texto"""
+    colors = {role: html.escape(value) for role, value in site.colors.items()}
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" fill="{colors["background"]}"/>',
+    ]
+    chars = width // 7
+    slim = height // 9
+    wide_blocks = [block for block in site.blocks if block.tag not in ("header", "nav", "footer")]
+    slim_total = sum(slim for block in site.blocks if block.tag in ("header", "nav", "footer"))
+    wide = (height - slim_total) // max(1, len(wide_blocks))
+
+    y = 0
+    for index, block in enumerate(site.blocks):
+        if block.tag in ("header", "nav"):
+            parts.append(f'<rect y="{y}" width="{width}" height="{slim}" fill="{colors["primary"]}"/>')
+            parts.append(_text(8, y + slim // 2 + 4, 10, "#ffffff", block.heading or site.title, chars))
+            y += slim
+        elif block.tag == "footer":
+            parts.append(f'<rect y="{y}" width="{width}" height="{slim}" fill="{colors["text"]}"/>')
+            y += slim
+        else:
+            fill = colors["muted"] if index % 2 else colors["background"]
+            parts.append(f'<rect y="{y}" width="{width}" height="{wide}" fill="{fill}"/>')
+            if block.heading:
+                parts.append(_text(12, y + 18, 11, site.colors["text"], block.heading, chars))
+            for line in range(min(3, max(0, (wide - 26) // 10))):
+                bar = width - 24 - line * width // 6
+                parts.append(
+                    f'<rect x="12" y="{y + 26 + line * 10}" width="{bar}" height="4" rx="2" '
+                    f'fill="{colors["text"]}" opacity="0.25"/>'
+                )
+            y += wide
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render(document: str) -> bytes:
+    return render_svg(snapshot(document)).encode("utf-8")
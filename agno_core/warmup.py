@@ -0,0 +1,101 @@
+"""
+Aquecimento na inicialização
+Importa o SDK do Gemini, cria os modelos de cada nível com cada chave configurada e abre
+os canais gRPC antes da primeira requisição. Opcionalmente faz uma chamada barata
+(count_tokens em um modelo substituto) por chave. O /api/health só informa `ready`
+depois que o aquecimento termina.
+"""
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Optional
+
+from .config import MODELS, MODEL_BASE, api_config
+from .scheduler import TIERS
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Chamada de teste por chave (count_tokens não gera texto); desligada por padrão
+WARMUP_PROBE = os.getenv("WARMUP_PROBE", "false").lower() == "true"
+WARMUP_PROBE_MODEL = os.getenv("WARMUP_PROBE_MODEL", MODEL_BASE)
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "10"))
+
+
+@dataclass
+class WarmupState:
+    status: str = "pending"  # pending, running, ready, disabled
+    started: Optional[float] = None
+    duration_ms: Optional[float] = None
+    models: int = 0
+    # Resultado por chave (nível:primary/backup): "ok" ou a mensagem de erro
+    channels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["ready"] = self.ready
+        return data
+
+
+warmup_state = WarmupState()
+
+
+def _configured_keys() -> Dict[str, str]:
+    """Chaves configuradas por nome (nível:primary/backup), sem repetir a mesma chave"""
+    keys: Dict[str, str] = {}
+    for level in TIERS:
+        for use_backup in (False, True):
+            api_key = api_config.get_api_key(level, use_backup)
+            if api_key and api_key.strip() and api_key not in keys.values():
+                keys[f"{level}:{'backup' if use_backup else 'primary'}"] = api_key
+    return keys
+
+
+def _warm_key(api_key: str) -> None:
+    from .clients import get_model, open_channel
+
+    for level in TIERS:
+        get_model(MODELS[level], api_key)
+    open_channel(api_key, WARMUP_TIMEOUT)
+    if WARMUP_PROBE:
+        get_model(WARMUP_PROBE_MODEL, api_key).count_tokens("ping")
+
+
+async def warm_up() -> WarmupState:
+    """Aquece SDK, modelos e canais; falhas ficam registradas por chave e não impedem o ready"""
+    state = warmup_state
+    if not WARMUP_ENABLED:
+        state.status = "disabled"
+        return state
+
+    state.status = "running"
+    state.started = time.time()
+    start = time.perf_counter()
+    try:
+        # Importa o núcleo dos agentes (e com ele o SDK) fora do event loop
+        await asyncio.to_thread(__import__, "agno_core.agents")
+    except Exception as e:
+        print(f"⚠️ [WARMUP] Falha ao importar os agentes: {str(e)}")
+
+    keys = _configured_keys()
+
+    async def warm(name: str, api_key: str):
+        try:
+            await asyncio.wait_for(asyncio.to_thread(_warm_key, api_key), WARMUP_TIMEOUT * 2)
+            state.channels[name] = "ok"
+        except Exception as e:
+            state.channels[name] = f"{type(e).__name__}: {str(e)}"[:200]
+            print(f"⚠️ [WARMUP] Falha ao aquecer a chave {name}: {str(e)}")
+
+    await asyncio.gather(*(warm(name, api_key) for name, api_key in keys.items()))
+
+    from .clients import model_count
+    state.models = model_count()
+    state.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    state.status = "ready"
+    ok = sum(1 for result in state.channels.values() if result == "ok")
+    print(f"🔥 [WARMUP] {state.models} modelo(s), {ok}/{len(keys)} canal(is) prontos em {state.duration_ms}ms")
+    return state
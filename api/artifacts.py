@@ -0,0 +1,129 @@
+"""
+Download dos artefatos gerados (sites), com ETag, Range e codificações pré-comprimidas,
+e as miniaturas SVG usadas no painel de artefatos
+"""
+import sys
+import os
+import re
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response
+
+# Permitir importar o núcleo compartilhado a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno_core.artifacts import artifact_store, ENCODINGS
+from agno_core import thumbnails
+
+router = APIRouter()
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_FILENAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# O artefato é HTML gerado: roda isolado em origem opaca, sem acesso ao localStorage da interface
+SANDBOX_POLICY = "sandbox allow-scripts allow-forms allow-popups allow-modals"
+# A miniatura é SVG estático: sem scripts nem recursos externos
+THUMBNAIL_POLICY = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+
+
+def _accepts(accept_encoding: str, encoding: str) -> bool:
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() in (encoding, "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _parse_range(header: str, size: int):
+    """Intervalo único (start, end) inclusivo; None se o cabeçalho não for aplicável"""
+    match = _RANGE.match(header.strip())
+    if not match or match.group() == "bytes=-":
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Sufixo: últimos N bytes
+        start, end = max(0, size - int(last)), size - 1
+    return start, end
+
+
+@router.api_route("/artifacts/{artifact_id}", methods=["GET", "HEAD"])
+async def get_artifact(artifact_id: str, request: Request, download: Optional[str] = None):
+    """
+    Entrega o artefato; o id é o hash do conteúdo, então a resposta é imutável.
+    Leituras de disco e descompressão rodam em threads para não travar o event loop.
+    """
+    meta = await asyncio.to_thread(artifact_store.meta, artifact_id)
+    if meta is None:
+        return Response(status_code=404, content="Artefato não encontrado")
+
+    etag = f'"{artifact_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+        "Content-Security-Policy": SANDBOX_POLICY,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if download is not None:
+        filename = _FILENAME.sub("_", download).strip("_") or "website"
+        if not filename.endswith(".html"):
+            filename += ".html"
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    media_type = meta["media_type"]
+    size = meta["size"]
+    range_header = request.headers.get("range")
+
+    # Intervalos são servidos sobre a representação sem compressão
+    if range_header:
+        if_range = request.headers.get("if-range")
+        byte_range = _parse_range(range_header, size) if not if_range or if_range == etag else None
+        if byte_range is not None:
+            start, end = byte_range
+            if start >= size or start > end:
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            body = (await asyncio.to_thread(artifact_store.read, artifact_id))[start:end + 1]
+            return Response(status_code=206, content=body, media_type=media_type, headers=headers)
+
+    accept_encoding = request.headers.get("accept-encoding", "")
+    for encoding in ENCODINGS:
+        if not _accepts(accept_encoding, encoding):
+            continue
+        path = await asyncio.to_thread(artifact_store.encoded_path, artifact_id, encoding)
+        if path:
+            headers["Content-Encoding"] = encoding
+            return FileResponse(path, media_type=media_type, headers=headers)
+
+    body = await asyncio.to_thread(artifact_store.read, artifact_id)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@router.get("/artifacts/{artifact_id}/thumbnail")
+async def get_thumbnail(artifact_id: str, request: Request):
+    """Miniatura SVG do site, gerada na primeira leitura e servida do disco depois"""
+    etag = f'"{artifact_id}-thumb-v{thumbnails.THUMBNAIL_VERSION}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Content-Security-Policy": THUMBNAIL_POLICY,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    suffix = f".thumb.v{thumbnails.THUMBNAIL_VERSION}.svg"
+    body = await asyncio.to_thread(artifact_store.derived, artifact_id, suffix, thumbnails.render)
+    if body is None:
+        return Response(status_code=404, content="Artefato não encontrado")
+    return Response(content=body, media_type="image/svg+xml", headers=headers)
@@ -4,37 +4,98 @@ Endpoint HTTP para chat - Substitui WebSocket no Vercel
 import sys
 import os
 import json
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+import math
+import asyncio
+from contextlib import AsyncExitStack
+from typing import List, Optional
+from fastapi import APIRouter, FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-# Remover importação direta para evitar falhas na inicialização em ambientes serverless
-# from agents import SupervisorAgent
+# Permitir importar o núcleo compartilhado a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno_core.retry import deadline_scope
+from agno_core.protocol import response_frame
+from agno_core.serialization import json_response, dumps_bytes
+from agno_core.admission import admission, client_key, AdmissionRejected
+from agno_core.scheduler import tier_scheduler
+from api.artifacts import router as artifacts_router
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# Tipo de chamada usado pelo escalonador para cada ferramenta decidida
+_BATCH_KIND = {"research": "research", "website": "coder"}
 
 # Create FastAPI app instance for API only
 app = FastAPI(title="Agno Chat API", version="1.0.0")
 
-# Implementar importação lazy do SupervisorAgent
-_supervisor = None
+# Rotas da API, também incluídas pelo servidor principal (main.py)
+router = APIRouter()
 
 def get_supervisor():
-    global _supervisor
-    if _supervisor is None:
-        try:
-            from agents import SupervisorAgent
-            _supervisor = SupervisorAgent()
-        except Exception as e:
-            # Logar erro sem quebrar endpoints simples como /api/health
-            print(f"❌ [INIT] Falha ao inicializar SupervisorAgent: {str(e)}")
-            _supervisor = None
-    return _supervisor
+    """Inicializa o SupervisorAgent no primeiro uso (dependências pesadas são carregadas sob demanda)"""
+    try:
+        from agno_core.agents import get_supervisor as core_supervisor
+        return core_supervisor()
+    except Exception as e:
+        # Logar erro sem quebrar endpoints simples como /api/health
+        print(f"❌ [INIT] Falha ao inicializar SupervisorAgent: {str(e)}")
+        return None
+
+@router.on_event("startup")
+async def load_fallback_templates():
+    """Pré-compila os templates de fallback e os prompts antes da primeira requisição"""
+    try:
+        from agno_core.fallbacks import load_templates
+        load_templates()
+    except Exception as e:
+        print(f"⚠️ [INIT] Falha ao carregar templates de fallback: {str(e)}")
+    try:
+        from agno_core.prompts import registry
+        registry.load()
+    except Exception as e:
+        print(f"⚠️ [INIT] Falha ao carregar os prompts: {str(e)}")
 
 class ChatMessage(BaseModel):
-    message: str
-    conversation_id: str = None
+    # A interface envia o texto em `content`; `message` é mantido por compatibilidade
+    message: Optional[str] = None
+    content: Optional[str] = None
+    conversation_id: Optional[str] = None
+    user_id: Optional[str] = None
+    # Site aberto na interface; pedidos de alteração editam este artefato
+    artifact_id: Optional[str] = None
 
-@app.post("/api/chat")
-async def chat_endpoint(chat_message: ChatMessage):
+    @property
+    def text(self) -> str:
+        return self.message or self.content or ""
+
+class BatchRequest(BaseModel):
+    messages: List[str]
+    conversation_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+def busy_response(rejection: AdmissionRejected) -> JSONResponse:
+    """Resposta 429 rápida com a espera estimada"""
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(rejection.retry_after)},
+        content={
+            "success": False,
+            "error": rejection.message,
+            "retry_after": rejection.retry_after,
+            "data": {
+                "type": "busy",
+                "reason": rejection.reason,
+                "content": f"{rejection.message} Tente novamente em {rejection.retry_after}s.",
+                "retry_after": rejection.retry_after
+            }
+        }
+    )
+
+@router.post("/api/chat")
+async def chat_endpoint(chat_message: ChatMessage, request: Request):
     """
     Endpoint HTTP para processar mensagens de chat
     Substitui a funcionalidade WebSocket para compatibilidade com Vercel
@@ -55,11 +116,21 @@ async def chat_endpoint(chat_message: ChatMessage):
             )
 
         # Process the message using the supervisor
-        response = await supervisor.process_request(chat_message.message)
+        client = client_key(
+            request.client.host if request.client else None,
+            chat_message.user_id,
+            chat_message.conversation_id
+        )
+        try:
+            async with admission.slot(client):
+                with deadline_scope():
+                    response = await supervisor.process_request(chat_message.text, chat_message.artifact_id)
+        except AdmissionRejected as rejection:
+            return busy_response(rejection)
         
-        return JSONResponse(content={
+        return await json_response({
             "success": True,
-            "data": response,
+            "data": response_frame(response),
             "conversation_id": chat_message.conversation_id
         })
         
@@ -77,10 +148,221 @@ async def chat_endpoint(chat_message: ChatMessage):
             }
         )
 
-@app.get("/api/health")
+async def run_batch(supervisor, messages: List[str]):
+    """Executa os itens com concorrência limitada e os entrega conforme terminam"""
+    with deadline_scope():
+        decisions = await supervisor.decide_many(messages)
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_item(index: int, message: str, decision: dict):
+        async with semaphore:
+            # Espera o rate limit do nível abrir em vez de começar chamadas que vão tomar 429
+            kind = _BATCH_KIND.get(decision.get("tool_type"), "chat") if decision.get("needs_tool") else "chat"
+            wait = await tier_scheduler.capacity(kind)
+            if wait > 0:
+                print(f"⏳ [BATCH] Item {index} aguardando {wait:.1f}s pelo rate limit ({kind})")
+                await asyncio.sleep(wait)
+            with deadline_scope():
+                try:
+                    result = await supervisor.execute(message, decision)
+                except Exception as e:
+                    from agno_core.agents import error_result
+                    result = error_result(e)
+            return index, result
+
+    tasks = [
+        asyncio.create_task(run_item(index, message, decision))
+        for index, (message, decision) in enumerate(zip(messages, decisions))
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, result = await finished
+            yield index, result
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Espera os cancelamentos para nenhuma chamada continuar depois de liberar a vaga
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@router.post("/api/batch")
+async def batch_endpoint(batch: BatchRequest, request: Request):
+    """
+    Processa várias mensagens em uma chamada. A resposta é NDJSON: uma linha
+    {"index", "status", "data"} por item, na ordem em que terminam.
+    """
+    if not batch.messages:
+        raise HTTPException(status_code=400, detail="Nenhuma mensagem enviada")
+    if len(batch.messages) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {BATCH_MAX_ITEMS} mensagens por lote")
+
+    supervisor = get_supervisor()
+    if supervisor is None:
+        raise HTTPException(status_code=500, detail="Não foi possível inicializar o SupervisorAgent")
+
+    client = client_key(
+        request.client.host if request.client else None,
+        batch.user_id,
+        batch.conversation_id
+    )
+    # Uma vaga para o lote inteiro, mantida até o último item ser enviado e com o peso
+    # dos itens que rodam ao mesmo tempo
+    slot = AsyncExitStack()
+    weight = min(BATCH_CONCURRENCY, len(batch.messages))
+    try:
+        await slot.enter_async_context(admission.slot(client, weight))
+    except AdmissionRejected as rejection:
+        return busy_response(rejection)
+
+    print(f"📦 [BATCH] Lote com {len(batch.messages)} mensagem(ns) de {client}")
+
+    async def lines():
+        try:
+            async for index, result in run_batch(supervisor, batch.messages):
+                yield dumps_bytes({
+                    "index": index,
+                    "status": result.get("status", "completed"),
+                    "data": response_frame(result)
+                }) + b"\n"
+        finally:
+            await slot.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+class JobRequest(BaseModel):
+    message: Optional[str] = None
+    content: Optional[str] = None
+    conversation_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self.message or self.content or ""
+
+@router.on_event("startup")
+async def start_job_workers():
+    from agno_core.jobs import job_runner
+    await job_runner.start()
+
+@router.on_event("shutdown")
+async def stop_job_workers():
+    from agno_core.jobs import job_runner
+    await job_runner.stop()
+
+warmup_tasks: List[asyncio.Task] = []
+
+@router.on_event("startup")
+async def start_warmup():
+    """Aquece SDK, modelos e canais em segundo plano; o servidor já aceita conexões"""
+    from agno_core.warmup import warm_up
+    warmup_tasks.append(asyncio.create_task(warm_up()))
+
+@router.on_event("shutdown")
+async def stop_warmup():
+    for task in warmup_tasks:
+        task.cancel()
+    await asyncio.gather(*warmup_tasks, return_exceptions=True)
+    warmup_tasks.clear()
+
+@router.post("/api/jobs", status_code=202)
+async def create_job(job_request: JobRequest, request: Request):
+    """Enfileira a mensagem e devolve o id do job sem esperar a geração"""
+    from agno_core.jobs import job_runner, JOB_MAX_QUEUED
+
+    if not job_request.text:
+        raise HTTPException(status_code=400, detail="Mensagem vazia")
+    if job_runner.depth >= JOB_MAX_QUEUED:
+        return busy_response(AdmissionRejected(
+            "busy", "Fila de jobs cheia.", admission.average_duration * job_runner.depth / max(job_runner.workers, 1)
+        ))
+
+    client = client_key(
+        request.client.host if request.client else None,
+        job_request.user_id,
+        job_request.conversation_id
+    )
+    job = await job_runner.submit(job_request.text, client)
+    return {
+        "success": True,
+        "job": job.to_dict(),
+        "url": f"/api/jobs/{job.id}",
+        "events": f"/api/jobs/{job.id}/events",
+        "conversation_id": job_request.conversation_id
+    }
+
+async def load_job(job_id: str):
+    from agno_core.jobs import job_runner
+
+    job = await asyncio.to_thread(job_runner.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+@router.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Estado atual do job; o resultado fica disponível depois de concluído"""
+    job = await load_job(job_id)
+    return await json_response({"success": True, "job": job.to_dict()})
+
+@router.get("/api/jobs/{job_id}/events")
+async def watch_job(job_id: str, request: Request):
+    """Acompanha o job por Server-Sent Events até ele terminar"""
+    from agno_core.jobs import job_runner
+
+    job = await load_job(job_id)
+
+    async def events():
+        current = job
+        last_seen = None
+        while True:
+            if (current.status, current.progress) != last_seen:
+                last_seen = (current.status, current.progress)
+                event = "done" if current.finished else "progress"
+                yield f"event: {event}\ndata: {dumps_bytes(current.to_dict()).decode('utf-8')}\n\n"
+            if current.finished or await request.is_disconnected():
+                return
+            await job_runner.wait_for_change(job_id)
+            current = await asyncio.to_thread(job_runner.store.get, job_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/api/health")
 async def health_check():
-    """Endpoint para verificar se a API está funcionando"""
-    return {"status": "ok", "message": "Chat API funcionando"}
+    """Endpoint para verificar se a API está funcionando; `ready` só fica true depois do aquecimento"""
+    from agno_core.warmup import warmup_state
+    return {
+        "status": "ok",
+        "message": "Chat API funcionando",
+        "ready": warmup_state.ready,
+        "warmup": warmup_state.to_dict()
+    }
+
+@router.get("/api/health/live")
+async def liveness_check():
+    """Liveness: o processo responde (não consulta nenhuma dependência)"""
+    from agno_core.health import liveness
+    return liveness()
+
+@router.get("/api/health/ready")
+async def readiness_check():
+    """Readiness: 200 se o worker pode receber tráfego, 503 com os motivos se não"""
+    from agno_core.health import readiness, retry_after
+
+    ready, report = await readiness()
+    if ready:
+        return await json_response(report)
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(math.ceil(retry_after(report)))},
+        content=report
+    )
+
+app.include_router(router)
+app.include_router(artifacts_router)
 
 # Export the app for Vercel
 handler = app
\ No newline at end of file
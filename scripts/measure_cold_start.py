@@ -0,0 +1,58 @@
+"""
+Mede o tempo de import (cold start) dos pontos de entrada em interpretadores novos
+e verifica que dependências pesadas não são carregadas na importação.
+
+Uso: python scripts/measure_cold_start.py [--runs 5] [--budget-ms 800]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["agno_core.agents", "api.chat", "main"]
+HEAVY_MODULES = ["google.generativeai", "google.ai.generativelanguage", "requests", "bs4", "agno_core.fallbacks"]
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    samples, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            return {"error": output.stderr.strip().splitlines()[-1] if output.stderr else "falhou"}
+        data = json.loads(output.stdout.strip().splitlines()[-1])
+        samples.append(data["ms"])
+        loaded.update(data["loaded"])
+    return {"median_ms": round(statistics.median(samples), 1), "heavy_loaded": sorted(loaded)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800)
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        result = measure(module, args.runs)
+        print(f"{module}: {result}")
+        if "error" in result or result["heavy_loaded"] or result["median_ms"] > args.budget_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
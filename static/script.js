@@ -1,8 +1,25 @@
 // HTTP Chat connection (substitui WebSocket para Vercel)
 let isConnected = true;
-let artifacts = [];
-let conversations = {};
+let socket = null; // WebSocket quando disponível (servidor local); senão HTTP
+let frameEncoding = 'json';
+const pendingChunks = {}; // Frames grandes chegam em envelopes 'chunk' e são remontados aqui
+let artifacts = []; // Resumos dos artefatos da conversa atual; o corpo fica no IndexedDB
+const artifactKeys = new Set(); // Chaves (hash do conteúdo) dos artefatos da lista, para deduplicar
+const artifactBodies = new Map(); // Corpos lidos recentemente
+const MAX_ARTIFACTS = 50;
+const MAX_CACHED_BODIES = 5;
+let conversations = {}; // Só metadados (id, título, data); as mensagens ficam no IndexedDB
+let currentMessages = [];
+let savedMessageCount = 0; // Mensagens de currentMessages já gravadas
 let currentConversationId = null;
+const CONVERSATION_PAGE = 50; // Conversas lidas do IndexedDB por vez, conforme o histórico rola
+const MESSAGE_PAGE = 50; // Mensagens renderizadas por vez ao abrir uma conversa longa
+let conversationCursor = null; // Timestamp da última conversa da página mais recente
+let hasMoreConversations = false;
+let loadingConversations = false;
+let renderedMessageStart = 0; // Índice em currentMessages da primeira mensagem no DOM
+let chatHistoryList = null;
+let artifactsList = null;
 let currentUser = localStorage.getItem('currentUser');
 
 // Initialize HTTP connection (substitui WebSocket)
@@ -13,6 +30,66 @@ function initConnection() {
     
     // Test connection
     testConnection();
+    
+    // Tentar o WebSocket com frames binários (msgpack); sem ele, o chat segue por HTTP
+    connectWebSocket();
+}
+
+// Junta os pedaços de um frame grande; devolve o frame quando todos chegarem
+function collectChunk(chunk) {
+    const parts = pendingChunks[chunk.id] || (pendingChunks[chunk.id] = { received: 0, data: new Array(chunk.total) });
+    if (parts.data[chunk.seq] === undefined) {
+        parts.data[chunk.seq] = chunk.data;
+        parts.received++;
+    }
+    if (parts.received < chunk.total) return null;
+    
+    delete pendingChunks[chunk.id];
+    return JSON.parse(parts.data.join(''));
+}
+
+// WebSocket com permessage-deflate (negociado pelo navegador) e frames msgpack para artefatos
+function connectWebSocket() {
+    if (typeof WebSocket === 'undefined') return;
+    
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const encoding = typeof decodeMsgpack === 'function' ? 'msgpack' : 'json';
+    let ws;
+    try {
+        ws = new WebSocket(`${protocol}://${window.location.host}/ws?encoding=${encoding}`);
+    } catch (error) {
+        console.log('⚠️ [CONEXÃO] WebSocket indisponível, usando HTTP');
+        return;
+    }
+    ws.binaryType = 'arraybuffer';
+    
+    ws.onmessage = function(event) {
+        let data;
+        try {
+            data = typeof event.data === 'string' ? JSON.parse(event.data) : decodeMsgpack(event.data);
+        } catch (error) {
+            console.error('❌ [WEBSOCKET] Erro ao decodificar frame:', error);
+            return;
+        }
+        if (data.type === 'chunk') {
+            data = collectChunk(data);
+            if (!data) return;
+        }
+        if (data.type === 'ready') {
+            socket = ws;
+            frameEncoding = data.encoding;
+            console.log(`✅ [WEBSOCKET] Conectado (frames: ${frameEncoding})`);
+            return;
+        }
+        handleMessage(data);
+    };
+    
+    ws.onclose = function() {
+        if (socket === ws) {
+            console.log('🔌 [WEBSOCKET] Conexão encerrada, usando HTTP');
+            socket = null;
+        }
+    };
 }
 
 // Test if API is working
@@ -35,20 +112,22 @@ async function testConnection() {
 
 // Handle incoming messages
 function handleMessage(data) {
-    hideTypingIndicator();
-    
     if (data.type === 'processing') {
+        // Status transitório: só atualiza o indicador, não entra no histórico
         console.log('⚙️ [PROCESSAMENTO] Processando resposta do agente...');
-        addMessage('assistant', data.content);
+        showTypingIndicator(data.content);
         
         // Process artifacts if present
         if (data.artifacts) {
             console.log('🎨 [ARTEFATOS] Processando artefatos:', data.artifacts); // Debug
             processArtifacts(data.artifacts);
         }
-        
-        console.log('✅ [PROCESSAMENTO] Resposta processada e salva');
-    } else if (data.type === 'response') {
+        return;
+    }
+    
+    hideTypingIndicator();
+    
+    if (data.type === 'response') {
         console.log('💬 [RESPOSTA] Processando resposta final do agente...');
         console.log('🔍 [DEBUG] Tipo de resposta:', data.response_type);
         
@@ -66,6 +145,11 @@ function handleMessage(data) {
         saveCurrentConversation();
         
         console.log('✅ [RESPOSTA] Resposta final processada e salva');
+    } else if (data.type === 'error') {
+        addMessage('assistant', `❌ ${data.content}`);
+    } else if (data.type === 'busy') {
+        // Servidor recusou por carga; nada foi processado
+        addMessage('assistant', `⏳ ${data.content}`);
     }
     
     // Save conversation
@@ -95,6 +179,19 @@ async function sendMessage() {
     // Show typing indicator
     showTypingIndicator();
     
+    // Pelo WebSocket, a resposta chega em handleMessage
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({
+            type: 'message',
+            content: message,
+            conversation_id: currentConversationId,
+            user_id: currentUser,
+            artifact_id: currentWebsiteId()
+        }));
+        console.log('✅ [ENVIO] Mensagem enviada via WebSocket');
+        return;
+    }
+    
     try {
         // Send via HTTP
         const response = await fetch('/api/chat', {
@@ -105,10 +202,18 @@ async function sendMessage() {
             body: JSON.stringify({
                 type: 'message',
                 content: message,
-                conversation_id: currentConversationId
+                conversation_id: currentConversationId,
+                user_id: currentUser,
+                artifact_id: currentWebsiteId()
             })
         });
         
+        if (response.status === 429) {
+            const busy = await response.json();
+            handleMessage(busy.data);
+            return;
+        }
+        
         if (!response.ok) {
             throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         }
@@ -142,6 +247,7 @@ function addMessage(sender, content) {
         minute: '2-digit' 
     });
     
+    const formatted = formatMessageContent(content);
     messageDiv.innerHTML = `
         <div class="avatar">
             <i class="fas fa-${sender === 'user' ? 'user' : 'robot'}"></i>
@@ -151,11 +257,12 @@ function addMessage(sender, content) {
                 <span class="name">${sender === 'user' ? 'Você' : 'Supervisor'}</span>
                 <span class="time">${time}</span>
             </div>
-            <div class="message-text">${formatMessageContent(content)}</div>
+            <div class="message-text">${formatted}</div>
         </div>
     `;
-    
+
     messagesContainer.appendChild(messageDiv);
+    currentMessages.push({ type: sender, content: formatted, timestamp: time });
     scrollToBottom();
 }
 
@@ -216,38 +323,44 @@ function processArtifacts(results) {
 function addArtifact(type, title, data) {
     console.log('🎨 [ARTEFATO] Tentando adicionar:', { type, title, data }); // Debug
     
-    // Verificar duplicatas baseadas no título e tipo
-    const isDuplicate = artifacts.some(artifact => 
-        artifact.type === type && 
-        artifact.title === title &&
-        JSON.stringify(artifact.data) === JSON.stringify(data)
-    );
-    
-    if (isDuplicate) {
+    // Duplicatas pela chave do conteúdo (sites do servidor usam o id do conteúdo)
+    const key = artifactKey(type, data);
+    if (artifactKeys.has(key)) {
         console.log('⚠️ [ARTEFATO] Duplicata detectada, ignorando:', title);
         return;
     }
-    
-    // Limitar o número de artefatos para evitar acúmulo excessivo
-    const MAX_ARTIFACTS = 20;
-    if (artifacts.length >= MAX_ARTIFACTS) {
-        console.log(`🧹 [ARTEFATO] Limite de ${MAX_ARTIFACTS} artefatos atingido, removendo os mais antigos`);
-        artifacts = artifacts.slice(0, MAX_ARTIFACTS - 1);
-    }
-    
-    const artifact = {
+
+    const { meta, body } = splitArtifact({
         id: Date.now() + Math.random(),
+        key: key,
         type: type,
         title: title,
         data: data,
         timestamp: new Date().toLocaleString('pt-BR'),
+        createdAt: Date.now(),
         conversationId: currentConversationId // Associar ao chat atual
-    };
-    
-    artifacts.unshift(artifact);
+    });
+
+    artifacts.unshift(meta);
+    artifactKeys.add(key);
+    cacheArtifactBody(key, body);
+    if (currentUser) {
+        agnoStore.putArtifact(currentUser, meta, body)
+            .catch(error => console.error('❌ [STORE] Falha ao gravar artefato:', error));
+    }
+
+    // Limitar o número de artefatos para evitar acúmulo excessivo
+    if (artifacts.length > MAX_ARTIFACTS) {
+        console.log(`🧹 [ARTEFATO] Limite de ${MAX_ARTIFACTS} artefatos atingido, removendo os mais antigos`);
+        const removed = artifacts.splice(MAX_ARTIFACTS);
+        removed.forEach(item => artifactKeys.delete(item.key));
+        if (currentUser) {
+            agnoStore.deleteArtifacts(currentUser, removed.map(item => item.key));
+        }
+    }
+
     updateArtifactsPanel();
     updateArtifactsCounter();
-    saveArtifacts();
     
     // Always show artifacts panel
     const panel = document.getElementById('artifactsPanel');
@@ -258,28 +371,87 @@ function addArtifact(type, title, data) {
     console.log('✅ [ARTEFATO] Adicionado com sucesso. Total:', artifacts.length);
 }
 
+// Campos que ficam no resumo do artefato; o resto (HTML, resultados da pesquisa) vai para o corpo
+const ARTIFACT_SUMMARY_FIELDS = [
+    'type', 'title', 'description', 'query', 'artifact_id', 'parent_id', 'url', 'size', 'excerpt', 'preview', 'inline'
+];
+
+function artifactKey(type, data) {
+    return `${type}:${data.artifact_id || agnoStore.hash(JSON.stringify(data))}`;
+}
+
+// Separa o artefato em resumo (lista do painel) e corpo (lido só ao abrir)
+function splitArtifact(artifact) {
+    const data = artifact.data || {};
+    const summary = {};
+    const body = {};
+    Object.entries(data).forEach(([field, value]) => {
+        (ARTIFACT_SUMMARY_FIELDS.includes(field) ? summary : body)[field] = value;
+    });
+    const key = artifact.key || artifactKey(artifact.type, data);
+    return {
+        meta: {
+            ...artifact,
+            key: key,
+            data: summary,
+            createdAt: artifact.createdAt || Date.parse(artifact.timestamp) || Date.now()
+        },
+        body: body
+    };
+}
+
+function cacheArtifactBody(key, body) {
+    artifactBodies.delete(key);
+    artifactBodies.set(key, body);
+    if (artifactBodies.size > MAX_CACHED_BODIES) {
+        artifactBodies.delete(artifactBodies.keys().next().value);
+    }
+}
+
+// Dados completos do artefato: resumo + corpo, buscado no IndexedDB na primeira abertura
+async function loadArtifactData(artifact) {
+    let body = artifactBodies.get(artifact.key);
+    if (!body && currentUser) {
+        body = await agnoStore.getArtifactBody(currentUser, artifact.key) || {};
+        cacheArtifactBody(artifact.key, body);
+    }
+    return { ...artifact.data, ...(body || {}) };
+}
+
 // Update artifacts panel
 function updateArtifactsPanel() {
-    const content = document.getElementById('artifactsContent');
-    
-    if (artifacts.length === 0) {
-        content.innerHTML = `
-            <div class="empty-state">
-                <i class="fas fa-folder-open"></i>
-                <p>Nenhum artefato disponível</p>
-                <small>Os artefatos aparecerão aqui quando os agentes gerarem resultados</small>
-            </div>
-        `;
-        return;
+    if (!artifactsList) {
+        artifactsList = new VirtualList(document.getElementById('artifactsContent'), {
+            key: artifact => artifact.key,
+            render: renderArtifactItem,
+            empty: `
+                <div class="empty-state">
+                    <i class="fas fa-folder-open"></i>
+                    <p>Nenhum artefato disponível</p>
+                    <small>Os artefatos aparecerão aqui quando os agentes gerarem resultados</small>
+                </div>
+            `
+        });
     }
-    
-    content.innerHTML = artifacts.map(artifact => `
-        <div class="artifact-item" onclick="viewArtifact(${artifact.id})">
-            <div class="artifact-title">${artifact.title}</div>
+    artifactsList.setItems(artifacts);
+}
+
+function renderArtifactItem(artifact) {
+    const item = document.createElement('div');
+    item.className = 'artifact-item';
+    item.onclick = () => viewArtifact(artifact.id);
+    const thumbnail = artifactThumbnailUrl(artifact);
+    item.innerHTML = `
+        ${thumbnail ? `<img class="artifact-thumbnail" src="${thumbnail}" loading="lazy" decoding="async" alt="">` : ''}
+        <div class="artifact-info">
+            <div class="artifact-title"></div>
             <div class="artifact-type">${artifact.type === 'research' ? '🔍 Pesquisa' : '💻 Website'}</div>
-            <div class="artifact-time">${artifact.timestamp}</div>
+            <div class="artifact-time"></div>
         </div>
-    `).join('');
+    `;
+    item.querySelector('.artifact-title').textContent = artifact.title;
+    item.querySelector('.artifact-time').textContent = artifact.timestamp;
+    return item;
 }
 
 // Update artifacts counter
@@ -295,10 +467,60 @@ function updateArtifactsCounter() {
     }
 }
 
+// Site mais recente da conversa; pedidos como "mude a cor do header" editam este site.
+// Sites com HTML embutido (`inline`) não estão no disco de outras instâncias do servidor.
+function currentWebsiteId() {
+    const website = artifacts.find(a =>
+        a.type === 'website' && artifactUrl(a) && a.conversationId === currentConversationId
+    );
+    return website ? website.data.artifact_id : null;
+}
+
+// URL do site guardado no servidor (/artifacts/{id}), ou null para artefatos com HTML embutido.
+// Com `inline` o servidor avisou que o disco não é compartilhado (ex.: Vercel): o HTML da resposta vale.
+function artifactUrl(artifact) {
+    const data = artifact.data;
+    return data.artifact_id && !data.inline ? `/artifacts/${data.artifact_id}` : null;
+}
+
+// Miniatura SVG gerada no servidor (só para sites guardados lá)
+function artifactThumbnailUrl(artifact) {
+    const url = artifactUrl(artifact);
+    return url ? `${url}/thumbnail` : null;
+}
+
+// HTML que veio na própria resposta (sites antigos ou `inline`); '' se não houver conteúdo
+function inlineWebsiteHtml(artifact, data) {
+    if (data.artifacts && typeof data.artifacts === 'object') {
+        // Se tem estrutura de código separado (html, css, js)
+        const code = data.artifacts;
+        return `
+            <!DOCTYPE html>
+            <html lang="pt-BR">
+            <head>
+                <meta charset="UTF-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>${artifact.title || 'Website'}</title>
+                <style>${code.css || ''}</style>
+            </head>
+            <body>
+                ${code.html || ''}
+                <script>${code.js || ''}</script>
+            </body>
+            </html>
+        `;
+    }
+    // Se tem conteúdo HTML direto
+    return data.content || '';
+}
+
 // View artifact details
-function viewArtifact(id) {
+async function viewArtifact(id) {
     const artifact = artifacts.find(a => a.id === id);
     if (!artifact) return;
+    // Sites do servidor abrem pela URL; o corpo só é lido para pesquisas e sites antigos com HTML embutido
+    const serverUrl = artifactUrl(artifact);
+    const data = serverUrl ? artifact.data : await loadArtifactData(artifact);
     
     const modal = document.getElementById('artifactModal');
     const title = document.getElementById('modalTitle');
@@ -311,19 +533,19 @@ function viewArtifact(id) {
             <h4>Resultados da Pesquisa</h4>
             <div style="margin: 15px 0;">
                 <h5>Consulta:</h5>
-                <p>${artifact.data.query}</p>
+                <p>${data.query}</p>
             </div>
             <div style="margin: 15px 0;">
                 <h5>Resultados:</h5>
                 <div style="background: #40414f; padding: 15px; border-radius: 6px;">
-                    ${formatMessageContent(artifact.data.results)}
+                    ${formatMessageContent(data.results)}
                 </div>
             </div>
-            ${artifact.data.sources ? `
+            ${data.sources ? `
                 <div style="margin: 15px 0;">
                     <h5>Fontes:</h5>
                     <ul>
-                        ${artifact.data.sources.map(source => 
+                        ${data.sources.map(source => 
                             `<li><a href="${source}" target="_blank">${source}</a></li>`
                         ).join('')}
                     </ul>
@@ -331,47 +553,19 @@ function viewArtifact(id) {
             ` : ''}
         `;
     } else if (artifact.type === 'website') {
-        // Preparar o conteúdo HTML para o iframe
-        let htmlContent = '';
-        
-        if (artifact.data.artifacts && typeof artifact.data.artifacts === 'object') {
-            // Se tem estrutura de código separado (html, css, js)
-            const code = artifact.data.artifacts;
-            htmlContent = `
-                <!DOCTYPE html>
-                <html lang="pt-BR">
-                <head>
-                    <meta charset="UTF-8">
-                    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                    <title>${artifact.title || 'Website Preview'}</title>
-                    <style>${code.css || ''}</style>
-                </head>
-                <body>
-                    ${code.html || ''}
-                    <script>${code.js || ''}</script>
-                </body>
-                </html>
-            `;
-        } else if (artifact.data.content) {
-            // Se tem conteúdo HTML direto
-            htmlContent = artifact.data.content;
-        } else {
-            htmlContent = '<p>Erro: Conteúdo do website não encontrado.</p>';
-        }
-        
-        // Criar o iframe com blob URL para melhor compatibilidade
-        const iframeId = `iframe_${artifact.id}`;
+        const thumbnail = artifactThumbnailUrl(artifact);
+        const htmlContent = serverUrl ? '' : inlineWebsiteHtml(artifact, data);
         
         body.innerHTML = `
             <h4>Pré-visualização do Website</h4>
             <div style="margin: 15px 0;">
                 <h5>Descrição:</h5>
-                <p>${artifact.data.description}</p>
+                <p>${data.description}</p>
             </div>
             <div style="margin: 15px 0; position: relative;">
-                <iframe id="${iframeId}" 
-                        style="width: 100%; height: 450px; border: 1px solid #ddd; border-radius: 8px; background: white;"
-                        sandbox="allow-scripts allow-same-origin allow-forms allow-popups allow-modals">
+                <iframe loading="lazy"
+                        style="width: 100%; height: 450px; border: 1px solid #ddd; border-radius: 8px; background: white ${thumbnail ? `url('${thumbnail}') center / cover no-repeat` : ''};"
+                        sandbox="allow-scripts allow-forms allow-popups allow-modals">
                 </iframe>
                 <div style="position: absolute; top: 5px; right: 5px; background: rgba(0,0,0,0.7); color: white; padding: 5px 10px; border-radius: 4px; font-size: 12px;">
                     Preview
@@ -404,73 +598,48 @@ function viewArtifact(id) {
             </div>
         `;
         
-        // Carregar o conteúdo no iframe após um pequeno delay
-        setTimeout(() => {
-            const iframe = document.getElementById(iframeId);
-            if (iframe) {
-                try {
-                    // Usar blob URL para carregar o conteúdo
-                    const blob = new Blob([htmlContent], { type: 'text/html' });
-                    const url = URL.createObjectURL(blob);
-                    
-                    iframe.onload = function() {
-                        console.log('✅ [MODAL] Website carregado no iframe do modal');
-                        // Limpar o URL do blob após o carregamento
-                        setTimeout(() => URL.revokeObjectURL(url), 1000);
-                    };
-                    
-                    iframe.onerror = function() {
-                        console.error('❌ [MODAL] Erro ao carregar website no iframe');
-                        iframe.srcdoc = '<p style="padding: 20px; text-align: center;">Erro ao carregar preview</p>';
-                    };
-                    
-                    iframe.src = url;
-                    
-                } catch (error) {
-                    console.error('❌ [MODAL] Erro ao criar blob URL:', error);
-                    // Fallback: usar srcdoc
-                    iframe.srcdoc = htmlContent;
-                }
-            }
-        }, 100);
+        // Sem allow-same-origin: o site roda em origem opaca, sem acesso ao IndexedDB da interface.
+        // A miniatura fica no fundo do iframe até a página carregar.
+        const iframe = body.querySelector('iframe');
+        if (serverUrl) {
+            iframe.src = serverUrl;
+        } else {
+            iframe.srcdoc = htmlContent || '<p style="padding: 20px; text-align: center;">Erro: Conteúdo do website não encontrado.</p>';
+        }
     }
     
     modal.classList.add('open');
 }
 
 // Preview website
-function previewWebsite(id) {
+async function previewWebsite(id) {
     const artifact = artifacts.find(a => a.id === id);
     if (!artifact || artifact.type !== 'website') return;
     
     console.log('🌐 [PREVIEW] Iniciando preview do website:', artifact);
     
-    // Verificar se os dados do artefato existem
-    let htmlContent = '';
+    const serverUrl = artifactUrl(artifact);
+    if (serverUrl) {
+        if (!window.open(serverUrl, '_blank')) {
+            console.error('❌ [PREVIEW] Popup bloqueado pelo navegador');
+            alert('Por favor, permita popups para visualizar o website.');
+        }
+        return;
+    }
     
-    if (artifact.data.artifacts && typeof artifact.data.artifacts === 'object') {
-        // Se tem estrutura de código separado (html, css, js)
-        const code = artifact.data.artifacts;
-        htmlContent = `
-            <!DOCTYPE html>
-            <html lang="pt-BR">
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>${artifact.title || 'Website Preview'}</title>
-                <style>${code.css || ''}</style>
-            </head>
-            <body>
-                ${code.html || ''}
-                <script>${code.js || ''}</script>
-            </body>
-            </html>
-        `;
-    } else if (artifact.data.content) {
-        // Se tem conteúdo HTML direto
-        htmlContent = artifact.data.content;
-    } else {
-        console.error('❌ [PREVIEW] Dados do artefato inválidos:', artifact.data);
+    // A janela abre já no clique; o conteúdo local chega depois da leitura do IndexedDB
+    const newWindow = window.open('', '_blank');
+    if (!newWindow) {
+        console.error('❌ [PREVIEW] Popup bloqueado pelo navegador');
+        alert('Por favor, permita popups para visualizar o website.');
+        return;
+    }
+    // Sites antigos, com HTML embutido: abre por blob URL (sites do servidor já saíram acima)
+    const data = await loadArtifactData(artifact);
+    const htmlContent = inlineWebsiteHtml(artifact, data);
+    if (!htmlContent) {
+        console.error('❌ [PREVIEW] Dados do artefato inválidos:', data);
+        newWindow.close();
         alert('Erro: Não foi possível carregar o conteúdo do website.');
         return;
     }
@@ -479,7 +648,7 @@ function previewWebsite(id) {
         const blob = new Blob([htmlContent], { type: 'text/html' });
         const url = URL.createObjectURL(blob);
         
-        const newWindow = window.open(url, '_blank');
+        newWindow.location.href = url;
         
         // Limpar o URL do blob após um tempo
         setTimeout(() => {
@@ -487,11 +656,6 @@ function previewWebsite(id) {
             console.log('✅ [PREVIEW] Website carregado com sucesso e URL limpo');
         }, 2000);
         
-        if (!newWindow) {
-            console.error('❌ [PREVIEW] Popup bloqueado pelo navegador');
-            alert('Por favor, permita popups para visualizar o website.');
-        }
-        
     } catch (error) {
         console.error('❌ [PREVIEW] Erro ao criar preview:', error);
         alert('Erro ao criar preview do website.');
@@ -499,37 +663,18 @@ function previewWebsite(id) {
 }
 
 // Download website
-function downloadWebsite(id) {
+async function downloadWebsite(id) {
     const artifact = artifacts.find(a => a.id === id);
     if (!artifact || artifact.type !== 'website') return;
+    const serverUrl = artifactUrl(artifact);
+    // Sites do servidor não precisam do corpo guardado no navegador
+    const data = serverUrl ? artifact.data : await loadArtifactData(artifact);
     
-    // Verificar se os dados do artefato existem
-    let htmlContent = '';
+    // Verificar se os dados do artefato existem (sites do servidor são baixados direto de lá)
+    const htmlContent = serverUrl ? '' : inlineWebsiteHtml(artifact, data);
     let filename = 'website.html';
-    
-    if (artifact.data.artifacts && typeof artifact.data.artifacts === 'object') {
-        // Se tem estrutura de código separado (html, css, js)
-        const code = artifact.data.artifacts;
-        htmlContent = `
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>${artifact.title || 'Website'}</title>
-                <style>${code.css || ''}</style>
-            </head>
-            <body>
-                ${code.html || ''}
-                <script>${code.js || ''}</script>
-            </body>
-            </html>
-        `;
-    } else if (artifact.data.content) {
-        // Se tem conteúdo HTML direto
-        htmlContent = artifact.data.content;
-    } else {
-        console.error('❌ [DOWNLOAD] Dados do artefato inválidos:', artifact.data);
+    if (!serverUrl && !htmlContent) {
+        console.error('❌ [DOWNLOAD] Dados do artefato inválidos:', data);
         alert('Erro: Não foi possível baixar o website.');
         return;
     }
@@ -543,15 +688,20 @@ function downloadWebsite(id) {
     }
     
     // Criar e baixar o arquivo
-    const blob = new Blob([htmlContent], { type: 'text/html' });
-    const url = URL.createObjectURL(blob);
     const a = document.createElement('a');
-    a.href = url;
+    if (serverUrl) {
+        a.href = `${serverUrl}?download=${encodeURIComponent(filename)}`;
+    } else {
+        const blob = new Blob([htmlContent], { type: 'text/html' });
+        a.href = URL.createObjectURL(blob);
+    }
     a.download = filename;
     document.body.appendChild(a);
     a.click();
     document.body.removeChild(a);
-    URL.revokeObjectURL(url);
+    if (!serverUrl) {
+        URL.revokeObjectURL(a.href);
+    }
     
     console.log('✅ [DOWNLOAD] Website baixado:', filename);
 }
@@ -569,7 +719,8 @@ function closeModal() {
 }
 
 // UI Helpers
-function showTypingIndicator() {
+function showTypingIndicator(status) {
+    document.getElementById('typingStatus').textContent = status || 'Agente está digitando...';
     document.getElementById('typingIndicator').style.display = 'flex';
     scrollToBottom();
 }
@@ -579,7 +730,8 @@ function hideTypingIndicator() {
 }
 
 function scrollToBottom() {
-    const container = document.getElementById('messages');
+    // Quem rola é o .chat-container, não a lista de mensagens
+    const container = document.getElementById('messages').parentElement;
     container.scrollTop = container.scrollHeight;
 }
 
@@ -631,12 +783,15 @@ function startNewChat() {
         </div>
     `;
     
-    // Clear artifacts from current conversation only
+    // Clear artifacts from current conversation only (continuam guardados no IndexedDB)
     console.log('🆕 [NOVO CHAT] Limpando artefatos da conversa atual...');
+    currentMessages = [];
+    savedMessageCount = 0;
+    renderedMessageStart = 0;
     artifacts = [];
+    artifactKeys.clear();
     updateArtifactsPanel();
     updateArtifactsCounter();
-    saveArtifacts();
 }
 
 function escapeHtml(text) {
@@ -646,76 +801,77 @@ function escapeHtml(text) {
 }
 
 // Persistence functions
+// Grava só o que mudou: os metadados da conversa e as mensagens ainda não salvas
 function saveCurrentConversation() {
     if (!currentUser) return;
     if (!currentConversationId) {
         currentConversationId = Date.now().toString();
     }
-    
-    const messages = Array.from(document.getElementById('messages').children)
-        .filter(msg => !msg.classList.contains('typing-indicator'))
-        .map(msg => ({
-            type: msg.classList.contains('user') ? 'user' : 'assistant',
-            content: msg.querySelector('.message-text').innerHTML,
-            timestamp: msg.querySelector('.time').textContent
-        }));
+    if (savedMessageCount === currentMessages.length) return;
     
     // Get title from first user message or use default
     let title = 'Nova Conversa';
-    const firstUserMessage = messages.find(msg => msg.type === 'user');
+    const firstUserMessage = currentMessages.find(msg => msg.type === 'user');
     if (firstUserMessage) {
         const textContent = firstUserMessage.content.replace(/<[^>]*>/g, ''); // Remove HTML tags
         title = textContent.length > 50 ? textContent.substring(0, 50) + '...' : textContent;
     }
     
-    conversations[currentConversationId] = {
+    const conversation = {
         id: currentConversationId,
         title: title,
-        messages: messages,
         timestamp: new Date().toISOString()
     };
-    
-    localStorage.setItem(`${currentUser}_conversations`, JSON.stringify(conversations));
+    conversations[currentConversationId] = conversation;
+    
+    const pending = currentMessages.slice(savedMessageCount);
+    const firstSeq = savedMessageCount;
+    savedMessageCount = currentMessages.length;
+    agnoStore.putConversation(currentUser, conversation)
+        .then(() => Promise.all(pending.map((message, index) =>
+            agnoStore.putMessage(currentUser, conversation.id, firstSeq + index, message)
+        )))
+        .catch(error => console.error('❌ [STORE] Falha ao gravar conversa:', error));
     updateChatHistory();
 }
 
-function saveArtifacts() {
+async function loadUserData() {
+    currentUser = localStorage.getItem('currentUser');
     if (currentUser) {
-        localStorage.setItem(`${currentUser}_artifacts`, JSON.stringify(artifacts));
+        await agnoStore.migrateFromLocalStorage(currentUser, splitArtifact);
+        conversations = {};
+        conversationCursor = null;
+        hasMoreConversations = true;
+        await loadMoreConversations();
     }
 }
 
-function loadUserData() {
-    currentUser = localStorage.getItem('currentUser');
-    if (currentUser) {
-        const savedArtifacts = localStorage.getItem(`${currentUser}_artifacts`);
-        artifacts = savedArtifacts ? JSON.parse(savedArtifacts) : [];
-        const savedConversations = localStorage.getItem(`${currentUser}_conversations`);
-        conversations = savedConversations ? JSON.parse(savedConversations) : {};
-        loadConversations();
+// Próxima página do histórico (mais antigas), pedida quando a lista chega perto do fim
+async function loadMoreConversations() {
+    if (!currentUser || loadingConversations || !hasMoreConversations) return;
+    loadingConversations = true;
+    try {
+        const list = await agnoStore.listConversations(currentUser, CONVERSATION_PAGE, conversationCursor);
+        list.forEach(conversation => {
+            if (!conversations[conversation.id]) {
+                conversations[conversation.id] = conversation;
+            }
+        });
+        hasMoreConversations = list.length === CONVERSATION_PAGE;
+        if (list.length) {
+            conversationCursor = list[list.length - 1].timestamp;
+        }
+        console.log(`📂 [PERSISTÊNCIA] ${list.length} conversa(s) carregada(s)`);
+    } finally {
+        loadingConversations = false;
     }
+    loadConversations();
 }
 
 function loadConversations() {
     updateChatHistory();
 }
 
-function loadArtifacts() {
-    const saved = localStorage.getItem('artifacts');
-    if (saved) {
-        try {
-            const loadedArtifacts = JSON.parse(saved);
-            console.log('📂 [PERSISTÊNCIA] Carregando artefatos salvos:', loadedArtifacts.length);
-            artifacts = loadedArtifacts;
-            updateArtifactsPanel();
-            updateArtifactsCounter();
-        } catch (e) {
-            console.error('❌ [PERSISTÊNCIA] Erro ao carregar artefatos:', e);
-            artifacts = [];
-        }
-    }
-}
-
 // Função para limpar artefatos antigos
 function clearOldArtifacts() {
     if (artifacts.length === 0) {
@@ -726,8 +882,12 @@ function clearOldArtifacts() {
     const count = artifacts.length;
     console.log(`🧹 [LIMPEZA] Limpando ${count} artefato(s)...`);
     
+    if (currentUser) {
+        agnoStore.deleteArtifacts(currentUser, artifacts.map(artifact => artifact.key));
+    }
     artifacts = [];
-    localStorage.removeItem('artifacts');
+    artifactKeys.clear();
+    artifactBodies.clear();
     updateArtifactsPanel();
     updateArtifactsCounter();
     
@@ -753,7 +913,9 @@ function clearOldArtifacts() {
 function clearAllData() {
     console.log('🧹 [LIMPEZA] Limpando todos os dados...');
     localStorage.clear();
+    agnoStore.clear();
     artifacts = [];
+    artifactBodies.clear();
     conversations = {};
     currentConversationId = null;
     updateArtifactsPanel();
@@ -770,15 +932,40 @@ function createNewConversation() {
     updateChatHistory();
 }
 
-function loadConversation(id) {
+// Mensagens e artefatos da conversa são lidos do IndexedDB só quando ela é aberta
+async function loadConversation(id) {
     const conversation = conversations[id];
     if (!conversation) return;
     
+    saveCurrentConversation();
     currentConversationId = id;
-    const messagesContainer = document.getElementById('messages');
-    messagesContainer.innerHTML = '';
+    const [messages, storedArtifacts] = await Promise.all([
+        agnoStore.getMessages(currentUser, id),
+        agnoStore.listArtifacts(currentUser, id)
+    ]);
+    if (currentConversationId !== id) return; // Outra conversa foi aberta enquanto lia
+    
+    currentMessages = messages.map(({ seq, ...msg }) => msg);
+    savedMessageCount = currentMessages.length;
+    // Só a última página entra no DOM; as anteriores aparecem ao rolar para o topo
+    renderedMessageStart = Math.max(0, currentMessages.length - MESSAGE_PAGE);
+    document.getElementById('messages').replaceChildren(
+        renderMessages(currentMessages.slice(renderedMessageStart))
+    );
+    
+    artifacts = storedArtifacts;
+    artifactKeys.clear();
+    artifacts.forEach(artifact => artifactKeys.add(artifact.key));
+    updateArtifactsPanel();
+    updateArtifactsCounter();
     
-    conversation.messages.forEach(msg => {
+    updateChatHistory();
+    scrollToBottom();
+}
+
+function renderMessages(messages) {
+    const fragment = document.createDocumentFragment();
+    messages.forEach(msg => {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${msg.type}`;
         messageDiv.innerHTML = `
@@ -793,45 +980,69 @@ function loadConversation(id) {
                 <div class="message-text">${msg.content}</div>
             </div>
         `;
-        messagesContainer.appendChild(messageDiv);
+        fragment.appendChild(messageDiv);
     });
-    
-    updateChatHistory();
-    scrollToBottom();
+    return fragment;
+}
+
+// Ao chegar perto do topo, insere a página anterior de mensagens mantendo a posição da rolagem
+function renderEarlierMessages() {
+    const scroller = document.getElementById('messages').parentElement;
+    if (renderedMessageStart === 0 || scroller.scrollTop > 200) return;
+    
+    const start = Math.max(0, renderedMessageStart - MESSAGE_PAGE);
+    const previousHeight = scroller.scrollHeight;
+    document.getElementById('messages').prepend(renderMessages(currentMessages.slice(start, renderedMessageStart)));
+    renderedMessageStart = start;
+    scroller.scrollTop += scroller.scrollHeight - previousHeight;
 }
 
 function updateChatHistory() {
     const chatHistory = document.getElementById('chatHistory');
     if (!chatHistory) return;
     
-    chatHistory.innerHTML = '';
+    if (!chatHistoryList) {
+        chatHistoryList = new VirtualList(chatHistory, {
+            key: conversation => conversation.id,
+            render: renderChatItem,
+            update: updateChatItem,
+            // Add current conversation if no conversations exist
+            empty: `
+                <div class="chat-item active">
+                    <i class="fas fa-comments"></i>
+                    <span>Conversa Atual</span>
+                </div>
+            `,
+            onNearEnd: loadMoreConversations
+        });
+    }
     
     // Sort conversations by timestamp (newest first)
     const sortedConversations = Object.values(conversations)
         .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-    
-    sortedConversations.forEach(conversation => {
-        const chatItem = document.createElement('div');
-        chatItem.className = `chat-item ${conversation.id === currentConversationId ? 'active' : ''}`;
-        chatItem.onclick = () => loadConversation(conversation.id);
-        
-        chatItem.innerHTML = `
-            <i class="fas fa-comments"></i>
-            <span>${conversation.title}</span>
-        `;
-        
-        chatHistory.appendChild(chatItem);
-    });
-    
-    // Add current conversation if no conversations exist
-    if (sortedConversations.length === 0) {
-        const chatItem = document.createElement('div');
-        chatItem.className = 'chat-item active';
-        chatItem.innerHTML = `
-            <i class="fas fa-comments"></i>
-            <span>Conversa Atual</span>
-        `;
-        chatHistory.appendChild(chatItem);
+    chatHistoryList.setItems(sortedConversations);
+}
+
+function renderChatItem(conversation) {
+    const chatItem = document.createElement('div');
+    chatItem.onclick = () => loadConversation(conversation.id);
+    chatItem.innerHTML = `
+        <i class="fas fa-comments"></i>
+        <span></span>
+    `;
+    updateChatItem(chatItem, conversation);
+    return chatItem;
+}
+
+// Atualiza só o que mudou no item (conversa ativa, título)
+function updateChatItem(chatItem, conversation) {
+    const className = `chat-item ${conversation.id === currentConversationId ? 'active' : ''}`;
+    if (chatItem.className !== className) {
+        chatItem.className = className;
+    }
+    const title = chatItem.querySelector('span');
+    if (title.textContent !== conversation.title) {
+        title.textContent = conversation.title;
     }
 }
 
@@ -840,7 +1051,6 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('🚀 [INICIALIZAÇÃO] Carregando aplicação...');
     
     loadConversations();
-    loadArtifacts();
     updateChatHistory();
     updateArtifactsCounter();
     // Initialize connection when page loads
@@ -852,6 +1062,9 @@ document.addEventListener('DOMContentLoaded', function() {
     const input = document.getElementById('messageInput');
     input.addEventListener('input', () => updateSendButton());
     
+    document.getElementById('messages').parentElement
+        .addEventListener('scroll', renderEarlierMessages, { passive: true });
+    
     // Close modal on outside click
     document.getElementById('artifactModal').addEventListener('click', function(e) {
         if (e.target === this) {
@@ -0,0 +1,187 @@
+// Armazenamento local da interface em IndexedDB
+// Conversas e mensagens são gravadas item a item; dos artefatos, a lista guarda só o resumo
+// e o corpo (HTML, texto da pesquisa) fica em um store separado, lido quando o artefato é aberto.
+const agnoStore = (() => {
+    const DB_NAME = 'agno';
+    const DB_VERSION = 1;
+    let dbPromise = null;
+
+    // Hash rápido (cyrb53) para deduplicar artefatos sem comparar o JSON inteiro
+    function hash(text) {
+        let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (let i = 0; i < text.length; i++) {
+            const ch = text.charCodeAt(i);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+    }
+
+    function request(req) {
+        return new Promise((resolve, reject) => {
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+    }
+
+    function open() {
+        if (dbPromise) return dbPromise;
+        if (typeof indexedDB === 'undefined') {
+            dbPromise = Promise.resolve(null);
+            console.log('⚠️ [STORE] IndexedDB indisponível, dados só nesta sessão');
+            return dbPromise;
+        }
+        dbPromise = new Promise((resolve) => {
+            const req = indexedDB.open(DB_NAME, DB_VERSION);
+            req.onupgradeneeded = () => {
+                const db = req.result;
+                const conversations = db.createObjectStore('conversations', { keyPath: 'key' });
+                conversations.createIndex('byUserTime', ['user', 'timestamp']);
+                db.createObjectStore('messages', { keyPath: ['conversationKey', 'seq'] });
+                const artifacts = db.createObjectStore('artifacts', { keyPath: 'key' });
+                artifacts.createIndex('byConversation', ['user', 'conversationId']);
+                artifacts.createIndex('byUser', 'user');
+                db.createObjectStore('artifactBodies', { keyPath: 'key' });
+            };
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => {
+                console.error('❌ [STORE] Falha ao abrir IndexedDB:', req.error);
+                resolve(null);
+            };
+        });
+        return dbPromise;
+    }
+
+    async function tx(stores, mode, work) {
+        const db = await open();
+        if (!db) return undefined;
+        const transaction = db.transaction(stores, mode);
+        const result = work(...[].concat(stores).map(name => transaction.objectStore(name)));
+        await new Promise((resolve, reject) => {
+            transaction.oncomplete = resolve;
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error);
+        });
+        return result instanceof IDBRequest ? result.result : result;
+    }
+
+    const conversationKey = (user, id) => `${user}:${id}`;
+
+    // Conversas: metadados (título, data) e mensagens em registros separados
+    function putConversation(user, conversation) {
+        return tx('conversations', 'readwrite', store => store.put({
+            key: conversationKey(user, conversation.id),
+            user: user,
+            id: conversation.id,
+            title: conversation.title,
+            timestamp: conversation.timestamp
+        }));
+    }
+
+    function putMessage(user, conversationId, seq, message) {
+        return tx('messages', 'readwrite', store => store.put({
+            conversationKey: conversationKey(user, conversationId),
+            seq: seq,
+            ...message
+        }));
+    }
+
+    // Metadados das conversas, da mais recente para a mais antiga; `before` pagina pelo timestamp
+    async function listConversations(user, limit = 50, before = null) {
+        const db = await open();
+        if (!db) return [];
+        const upper = before ? [user, before] : [user, '￿'];
+        const range = IDBKeyRange.bound([user, ''], upper, false, Boolean(before));
+        const index = db.transaction('conversations').objectStore('conversations').index('byUserTime');
+        const items = [];
+        return new Promise((resolve, reject) => {
+            const req = index.openCursor(range, 'prev');
+            req.onsuccess = () => {
+                const cursor = req.result;
+                if (!cursor || items.length >= limit) return resolve(items);
+                const { key, user: owner, ...meta } = cursor.value;
+                items.push(meta);
+                cursor.continue();
+            };
+            req.onerror = () => reject(req.error);
+        });
+    }
+
+    async function getMessages(user, conversationId) {
+        const key = conversationKey(user, conversationId);
+        const range = IDBKeyRange.bound([key, 0], [key, Infinity]);
+        const rows = await tx('messages', 'readonly', store => store.getAll(range));
+        return (rows || []).map(({ conversationKey: _, ...message }) => message);
+    }
+
+    // Artefatos: resumo na lista, corpo lido sob demanda
+    function putArtifact(user, artifact, body) {
+        return tx(['artifacts', 'artifactBodies'], 'readwrite', (metas, bodies) => {
+            metas.put({ ...artifact, key: `${user}:${artifact.key}`, hash: artifact.key, user: user });
+            bodies.put({ key: `${user}:${artifact.key}`, body: body });
+        });
+    }
+
+    async function listArtifacts(user, conversationId) {
+        const rows = await tx('artifacts', 'readonly', store =>
+            store.index('byConversation').getAll([user, conversationId])
+        );
+        return (rows || [])
+            .map(({ key, user: owner, hash: artifactKey, ...meta }) => ({ ...meta, key: artifactKey }))
+            .sort((a, b) => b.createdAt - a.createdAt);
+    }
+
+    async function getArtifactBody(user, artifactKey) {
+        const row = await tx('artifactBodies', 'readonly', store => store.get(`${user}:${artifactKey}`));
+        return row ? row.body : null;
+    }
+
+    async function deleteArtifacts(user, artifactKeys) {
+        return tx(['artifacts', 'artifactBodies'], 'readwrite', (metas, bodies) => {
+            artifactKeys.forEach(artifactKey => {
+                metas.delete(`${user}:${artifactKey}`);
+                bodies.delete(`${user}:${artifactKey}`);
+            });
+        });
+    }
+
+    async function clear() {
+        return tx(['conversations', 'messages', 'artifacts', 'artifactBodies'], 'readwrite',
+            (...stores) => stores.forEach(store => store.clear()));
+    }
+
+    // Importa os blobs antigos do localStorage (`<usuário>_conversations`/`_artifacts`) uma única vez
+    async function migrateFromLocalStorage(user, splitArtifact) {
+        const savedConversations = localStorage.getItem(`${user}_conversations`);
+        const savedArtifacts = localStorage.getItem(`${user}_artifacts`);
+        if (!savedConversations && !savedArtifacts) return;
+        if (!(await open())) return;
+        try {
+            const conversations = savedConversations ? JSON.parse(savedConversations) : {};
+            for (const conversation of Object.values(conversations)) {
+                await putConversation(user, conversation);
+                for (const [seq, message] of (conversation.messages || []).entries()) {
+                    await putMessage(user, conversation.id, seq, message);
+                }
+            }
+            const artifacts = savedArtifacts ? JSON.parse(savedArtifacts) : [];
+            for (const [index, artifact] of artifacts.entries()) {
+                // A lista antiga vinha da mais recente para a mais antiga
+                const { meta, body } = splitArtifact({ ...artifact, createdAt: artifact.createdAt || Date.now() - index });
+                await putArtifact(user, meta, body);
+            }
+            localStorage.removeItem(`${user}_conversations`);
+            localStorage.removeItem(`${user}_artifacts`);
+            console.log(`📦 [STORE] Migrados ${Object.keys(conversations).length} conversa(s) e ${artifacts.length} artefato(s) do localStorage`);
+        } catch (error) {
+            console.error('❌ [STORE] Falha ao migrar dados do localStorage:', error);
+        }
+    }
+
+    return {
+        hash, open, putConversation, putMessage, listConversations, getMessages,
+        putArtifact, listArtifacts, getArtifactBody, deleteArtifacts, clear, migrateFromLocalStorage
+    };
+})();
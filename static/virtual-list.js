@@ -0,0 +1,114 @@
+// Lista com rolagem virtual para o histórico de conversas e o painel de artefatos
+// Só as linhas visíveis (mais uma margem) ficam no DOM; o resto é representado por dois
+// espaçadores. As linhas têm altura fixa, medida na primeira linha renderizada, e os nós
+// são reaproveitados pela chave: uma mudança na lista só cria, move ou atualiza o que mudou.
+class VirtualList {
+    constructor(container, { key, render, update = null, empty = '', overscan = 8, initialRows = 30, onNearEnd = null }) {
+        this.container = container;
+        this.key = key;
+        this.render = render;
+        this.update = update;
+        this.empty = empty;
+        this.overscan = overscan;
+        this.initialRows = initialRows;
+        this.onNearEnd = onNearEnd;
+        this.items = [];
+        this.nodes = new Map();
+        this.rowHeight = 0;
+        this.frame = null;
+        this.before = document.createElement('div');
+        this.after = document.createElement('div');
+
+        container.addEventListener('scroll', () => this.schedule(), { passive: true });
+        if (typeof ResizeObserver !== 'undefined') {
+            // Painel que estava oculto e passa a ter altura: mede de novo e preenche a janela
+            new ResizeObserver(() => this.schedule()).observe(container);
+        }
+    }
+
+    // Troca os itens e atualiza o DOM na hora (rolagem e redimensionamento esperam o próximo frame)
+    setItems(items) {
+        this.items = items;
+        this.draw();
+    }
+
+    schedule() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => this.draw());
+        }
+    }
+
+    measure(node) {
+        const style = getComputedStyle(node);
+        return node.offsetHeight + parseFloat(style.marginTop) + parseFloat(style.marginBottom);
+    }
+
+    draw() {
+        if (this.frame !== null) {
+            cancelAnimationFrame(this.frame);
+            this.frame = null;
+        }
+        const { container, items, nodes } = this;
+
+        if (items.length === 0) {
+            nodes.clear();
+            container.innerHTML = this.empty;
+            return;
+        }
+        // Alguém reescreveu o conteúdo (ex.: mensagem de limpeza): monta os espaçadores de novo
+        if (this.before.parentNode !== container) {
+            nodes.clear();
+            container.replaceChildren(this.before, this.after);
+        }
+
+        let start = 0;
+        let end = Math.min(items.length, this.initialRows);
+        const rowHeight = this.rowHeight;
+        if (rowHeight) {
+            const listTop = this.before.getBoundingClientRect().top - container.getBoundingClientRect().top + container.scrollTop;
+            const scroll = Math.max(0, container.scrollTop - listTop);
+            start = Math.max(0, Math.floor(scroll / rowHeight) - this.overscan);
+            end = Math.min(items.length, Math.ceil((scroll + container.clientHeight) / rowHeight) + this.overscan);
+        }
+
+        const visible = items.slice(start, end);
+        const keys = new Set(visible.map(this.key));
+        for (const [key, node] of nodes) {
+            if (!keys.has(key)) {
+                node.remove();
+                nodes.delete(key);
+            }
+        }
+
+        let cursor = this.before.nextSibling;
+        visible.forEach(item => {
+            const key = this.key(item);
+            let node = nodes.get(key);
+            if (!node) {
+                node = this.render(item);
+                nodes.set(key, node);
+            } else if (this.update) {
+                this.update(node, item);
+            }
+            if (node === cursor) {
+                cursor = cursor.nextSibling;
+            } else {
+                container.insertBefore(node, cursor);
+            }
+        });
+
+        if (!rowHeight && visible.length) {
+            this.rowHeight = this.measure(nodes.get(this.key(visible[0])));
+            if (this.rowHeight) {
+                this.schedule();
+            }
+        }
+        const height = this.rowHeight || 0;
+        this.before.style.height = `${start * height}px`;
+        this.after.style.height = `${(items.length - end) * height}px`;
+
+        if (this.onNearEnd && end >= items.length - this.overscan) {
+            this.onNearEnd();
+        }
+    }
+}